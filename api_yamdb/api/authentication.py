@@ -0,0 +1,38 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+
+from .cache import PREFIX, get_cache
+
+CACHED_FIELDS = ('id', 'username', 'role', 'is_active', 'is_superuser')
+
+
+def user_cache_key(user_id):
+    return f'{PREFIX}:user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, берущая пользователя из кеша.
+
+    Запись живёт AUTH_USER_CACHE_TIMEOUT секунд и удаляется при сохранении
+    или удалении пользователя, так что смена роли видна сразу. Во всех
+    воркерах — только с общим кешем (REDIS_URL): в кеше процесса другие
+    воркеры увидят смену роли или блокировку лишь по истечении записи.
+
+    В кеше лежат только поля CACHED_FIELDS, без хеша пароля и почты;
+    остальные поля пользователя отложены и читаются из БД при обращении.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            user = super().get_user(validated_token)
+            values = [getattr(user, field) for field in CACHED_FIELDS]
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        return User.from_db(None, CACHED_FIELDS, values)
@@ -0,0 +1,114 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+PREFIX = 'yamdb'
+HIT = 'hit'
+MISS = 'miss'
+# Версия всех данных каталога, от неё зависит любой ответ. Её сбрасывают
+# команды, меняющие данные в обход сигналов моделей.
+CATALOGUE = ('catalogue',)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _key(kind, *parts):
+    return ':'.join((PREFIX, kind) + tuple(str(part) for part in parts))
+
+
+def _new_version():
+    # Версия, вытесненная из кеша, не должна совпасть с уже выданной,
+    # иначе снова начнут отдаваться старые ответы.
+    return time.time_ns()
+
+
+def get_versions(*names):
+    """Текущие версии таблиц или объектов, например ('title', 1)."""
+    cache = get_cache()
+    keys = [_key('version', *name) for name in names]
+    versions = cache.get_many(keys)
+    timeout = settings.API_VERSION_TIMEOUT
+    for name, key in zip(names, keys):
+        if key not in versions:
+            if cache.add(key, _new_version(), timeout=timeout):
+                cache.set(_key('modified', *name), int(time.time()),
+                          timeout=timeout)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_last_modified(*names):
+    """Время последнего изменения данных names, Unix-время в секундах."""
+    cache = get_cache()
+    keys = [_key('modified', *name) for name in names]
+    modified = cache.get_many(keys)
+    now = int(time.time())
+    for key in keys:
+        if key not in modified:
+            cache.add(key, now, timeout=settings.API_VERSION_TIMEOUT)
+            modified[key] = now
+    return max(modified.values(), default=now)
+
+
+def bump_version(*name):
+    """Сделать недействительными все ответы, зависящие от name."""
+    cache = get_cache()
+    key = _key('version', *name)
+    timeout = settings.API_VERSION_TIMEOUT
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=timeout)
+    cache.set(_key('modified', *name), int(time.time()), timeout=timeout)
+
+
+def bump_on_commit(*names):
+    """Сбросить версии после коммита, чтобы не закешировать старые данные."""
+    for name in names:
+        transaction.on_commit(partial(bump_version, *name))
+
+
+def response_key(view_name, versions, request):
+    query = hashlib.md5(
+        request.get_full_path().encode('utf-8')).hexdigest()
+    version = '.'.join(str(item) for item in versions)
+    return f'{PREFIX}:response:{view_name}:{version}:{query}'
+
+
+def make_etag(versions, request):
+    """ETag из версий данных, адреса и формата ответа — без рендеринга."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    source = '{}|{}|{}'.format(
+        '.'.join(str(item) for item in versions),
+        request.get_full_path(),
+        renderer.format if renderer else '',
+    )
+    return '"{}"'.format(hashlib.md5(source.encode('utf-8')).hexdigest())
+
+
+def count(event):
+    """Увеличить общий для всех воркеров счётчик попаданий/промахов."""
+    cache = get_cache()
+    key = f'{PREFIX}:stats:{event}'
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    cache = get_cache()
+    stats = {
+        event: cache.get(f'{PREFIX}:stats:{event}', 0)
+        for event in (HIT, MISS)
+    }
+    total = stats[HIT] + stats[MISS]
+    stats['hit_ratio'] = round(stats[HIT] / total, 4) if total else None
+    return stats
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии ответов, закешированные пользователи, счётчики ограничений
+    частоты и закрепление за основной базой видны другим процессам
+    (воркерам, purger, leaderboards, командам) только в общем кеше."""
+    if settings.DEBUG or not isinstance(
+            caches[settings.API_CACHE_ALIAS], LocMemCache):
+        return []
+    return [Warning(
+        'Кеш API хранится в памяти процесса: изменения из других '
+        'процессов не сбрасывают ETag и кеш ответов, ограничения частоты '
+        'считаются в каждом воркере отдельно.',
+        hint='Укажите REDIS_URL (сервис redis в infra/docker-compose.yaml).',
+        id='api.W001',
+    )]
@@ -0,0 +1,67 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .cache import PREFIX, get_cache
+
+_replica_alias = ContextVar('replica_alias', default=None)
+
+
+class ReplicaRouter:
+    """Чтение с реплики только внутри allow_replica_reads, всё остальное —
+    с основной базы.
+
+    Реплики включает ReplicaReadMixin для безопасных запросов, поэтому
+    фоновые команды, админка и аутентификация читают с основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def allow_replica_reads():
+    """Читать с одной случайной реплики до reset_replica_reads: все
+    запросы ответа, включая prefetch, видят одну копию данных."""
+    replicas = settings.REPLICA_DATABASES
+    return _replica_alias.set(random.choice(replicas) if replicas else None)
+
+
+def reset_replica_reads(token):
+    _replica_alias.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Читать с основной базы, даже если реплики разрешены."""
+    token = _replica_alias.set(None)
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+def _pin_key(request):
+    if request.user and request.user.is_authenticated:
+        return f'{PREFIX}:pin:user:{request.user.pk}'
+    return f'{PREFIX}:pin:ip:{request.META.get("REMOTE_ADDR")}'
+
+
+def pin_to_primary(request):
+    """После записи клиент REPLICA_LAG_SECONDS читает с основной базы,
+    чтобы увидеть собственные изменения."""
+    get_cache().set(_pin_key(request), True, settings.REPLICA_LAG_SECONDS)
+
+
+def is_pinned(request):
+    return bool(get_cache().get(_pin_key(request)))
@@ -1,22 +1,36 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django.db.models import Exists, OuterRef
+from django_filters.rest_framework import BaseInFilter, CharFilter, FilterSet
 
 from reviews.models import Title
 
 
+class CharInFilter(BaseInFilter, CharFilter):
+    """Несколько значений через запятую: ?genre=drama,comedy"""
+
+
 class TitleFilter(FilterSet):
     name = CharFilter(
         field_name='name',
         lookup_expr='contains'
     )
-    category = CharFilter(
+    category = CharInFilter(
         field_name='category__slug',
-        lookup_expr='contains'
-    )
-    genre = CharFilter(
-        field_name='genre__slug',
-        lookup_expr='contains'
+        lookup_expr='in'
     )
+    genre = CharInFilter(method='filter_genre')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category')
+        fields = ('name', 'year', 'genre', 'category', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        # EXISTS вместо JOIN: произведение с несколькими подходящими
+        # жанрами попадает в выдачу один раз и без DISTINCT.
+        return queryset.filter(Exists(
+            Title.genre.through.objects.filter(
+                title_id=OuterRef('pk'), genre__slug__in=value)
+        ))
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
@@ -0,0 +1,199 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Замеры одного запроса: SQL, время в БД и в сериализаторах."""
+
+    def __init__(self, collect_sql=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.sql = {} if collect_sql else None
+        self._depth = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            if self.sql is not None:
+                self.sql[sql] = self.sql.get(sql, 0) + 1
+
+
+def start_request(collect_sql=False):
+    stats = RequestStats(collect_sql)
+    return stats, _current.set(stats)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def serialize_timer():
+    """Время сериализации; вложенные сериализаторы не считаются дважды."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    stats._depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats._depth -= 1
+        if not stats._depth:
+            stats.serialize_time += time.perf_counter() - started
+
+
+class TimedSerializerMixin:
+    """Учитывает to_representation во времени сериализации запроса."""
+
+    def to_representation(self, instance):
+        with serialize_timer():
+            return super().to_representation(instance)
+
+
+class Registry:
+    """Счётчики и гистограммы в памяти процесса в формате Prometheus.
+
+    У каждого воркера gunicorn свой набор значений, Prometheus собирает
+    их по отдельности и суммирует при запросе.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': buckets,
+                    'counts': [0] * len(buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            index = bisect_left(buckets, value)
+            if index < len(buckets):
+                histogram['counts'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def get(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        return self.counters.get(key, 0)
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(
+                (key, dict(value, counts=list(value['counts'])))
+                for key, value in self.histograms.items())
+        lines, described = [], set()
+
+        def header(name):
+            if name in described or name not in self.help:
+                return
+            described.add(name)
+            kind, text = self.help[name]
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f'{name}{format_labels(labels)} {value}')
+        for (name, labels), histogram in histograms:
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(histogram['buckets'],
+                                           histogram['counts']):
+                cumulative += bucket_count
+                bucket_labels = labels + (('le', str(bound)),)
+                lines.append(f'{name}_bucket{format_labels(bucket_labels)} '
+                             f'{cumulative}')
+            inf_labels = labels + (('le', '+Inf'),)
+            lines.append(f'{name}_bucket{format_labels(inf_labels)} '
+                         f'{histogram["count"]}')
+            lines.append(f'{name}_sum{format_labels(labels)} '
+                         f'{histogram["sum"]}')
+            lines.append(f'{name}_count{format_labels(labels)} '
+                         f'{histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels
+    ) + '}'
+
+
+registry = Registry()
+registry.describe('yamdb_http_requests_total', 'counter',
+                  'Количество запросов.')
+registry.describe('yamdb_http_request_duration_seconds', 'histogram',
+                  'Время обработки запроса.')
+registry.describe('yamdb_db_queries', 'histogram',
+                  'Количество SQL-запросов на один запрос к API.')
+registry.describe('yamdb_db_duration_seconds_total', 'counter',
+                  'Суммарное время SQL-запросов.')
+registry.describe('yamdb_serialize_duration_seconds_total', 'counter',
+                  'Суммарное время сериализации.')
+registry.describe('yamdb_http_response_size_bytes_total', 'counter',
+                  'Суммарный размер тел ответов.')
+registry.describe('yamdb_query_budget_exceeded_total', 'counter',
+                  'Запросы, превысившие QUERY_COUNT_BUDGET.')
+
+
+def record(view, method, status_code, stats, duration, size):
+    labels = {'view': view}
+    registry.inc('yamdb_http_requests_total',
+                 {'view': view, 'method': method, 'status': status_code})
+    registry.observe('yamdb_http_request_duration_seconds', labels,
+                     duration, DURATION_BUCKETS)
+    registry.observe('yamdb_db_queries', labels, stats.queries,
+                     QUERY_BUCKETS)
+    registry.inc('yamdb_db_duration_seconds_total', labels, stats.db_time)
+    registry.inc('yamdb_serialize_duration_seconds_total', labels,
+                 stats.serialize_time)
+    if size is not None:
+        registry.inc('yamdb_http_response_size_bytes_total', labels, size)
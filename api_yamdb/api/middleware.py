@@ -0,0 +1,75 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('api.performance')
+
+
+class PerformanceMiddleware:
+    """Замеры запроса: число SQL-запросов, время в БД и в сериализаторах,
+    размер ответа.
+
+    Результат отдаётся клиенту в заголовке Server-Timing и копится
+    в счётчиках по имени представления (api/metrics.py). Если запросов
+    к БД больше QUERY_COUNT_BUDGET, вызывается budget_exceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERFORMANCE_METRICS:
+            return self.get_response(request)
+        budget = settings.QUERY_COUNT_BUDGET
+        stats, token = metrics.start_request(collect_sql=bool(budget))
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        duration = stats.total_time
+
+        view = self.view_name(request)
+        size = None if response.streaming else len(response.content)
+        metrics.record(view, request.method, response.status_code, stats,
+                       duration, size)
+        response['Server-Timing'] = self.server_timing(stats, duration)
+        if budget and stats.queries > budget:
+            metrics.registry.inc(
+                'yamdb_query_budget_exceeded_total', {'view': view})
+            self.budget_exceeded(request, view, stats, budget)
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return match.view_name or match._func_path
+
+    @staticmethod
+    def server_timing(stats, duration):
+        app_time = max(duration - stats.db_time - stats.serialize_time, 0)
+        return ', '.join((
+            'db;dur={:.2f};desc="{} queries"'.format(
+                stats.db_time * 1000, stats.queries),
+            'serialize;dur={:.2f}'.format(stats.serialize_time * 1000),
+            'app;dur={:.2f}'.format(app_time * 1000),
+            'total;dur={:.2f}'.format(duration * 1000),
+        ))
+
+    def budget_exceeded(self, request, view, stats, budget):
+        """Вызывается, если запрос сделал больше budget SQL-запросов."""
+        sql, repeats = max(stats.sql.items(), key=lambda item: item[1])
+        logger.warning(
+            '%s %s (%s): %d SQL-запросов при бюджете %d, %.1f мс в БД; '
+            'чаще всего (%d раз): %s',
+            request.method, request.get_full_path(), view, stats.queries,
+            budget, stats.db_time * 1000, repeats, sql,
+        )
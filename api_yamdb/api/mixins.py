@@ -1,12 +1,175 @@
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connections, router, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework.generics import DestroyAPIView, ListCreateAPIView
+from rest_framework.renderers import JSONRenderer
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.viewsets import GenericViewSet
 from rest_framework import filters, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from reviews import deletion
+from .cache import (CATALOGUE, HIT, MISS, count, get_cache,
+                    get_last_modified, get_versions, make_etag, response_key)
+from .db_router import (allow_replica_reads, is_pinned, pin_to_primary,
+                        primary_reads, reset_replica_reads)
 from .permissions import IsAdmin
+from .renderers import ORJSONRenderer
+
+
+class ReplicaReadMixin:
+    """Безопасные запросы читают с реплик после аутентификации и проверки
+    прав. Успешная запись закрепляет пользователя за основной базой на
+    REPLICA_LAG_SECONDS, чтобы он сразу видел свои изменения."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request):
+            self.replica_token = allow_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'replica_token', None)
+        if token is not None:
+            reset_replica_reads(token)
+            self.replica_token = None
+        if (request.method not in SAFE_METHODS
+                and response.status_code < status.HTTP_400_BAD_REQUEST):
+            pin_to_primary(request)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class FastJSONMixin:
+    """При FAST_JSON список строится row_serializer_class по .values()
+    и рендерится orjson; ответ совпадает с обычным байт в байт."""
+    row_serializer_class = None
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if not settings.FAST_JSON:
+            return renderers
+        return [
+            ORJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_JSON or self.row_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.row_serializer_class()
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.data(page))
+        return Response(serializer.data(rows))
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list и retrieve по версиям данных, от
+    которых зависит ответ. На совпавший If-None-Match отвечает 304 без
+    запросов к БД и сериализации. Версии сбрасываются сигналами из
+    api/signals.py."""
+    cache_tables = ()
+    cache_object = None
+
+    def get_version_period(self):
+        """Через сколько секунд ответ устаревает сам, без изменения данных,
+        или None."""
+        return None
+
+    def get_version_names(self):
+        if self.action == 'retrieve' and self.cache_object:
+            # Объект зависит от своей версии, а не от версии всей таблицы:
+            # изменения других строк её не сбрасывают.
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            return [
+                *((table,) for table in self.cache_tables
+                  if table != self.cache_object),
+                (self.cache_object, self.kwargs[lookup]),
+            ]
+        return [(table,) for table in self.cache_tables]
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        names = [CATALOGUE, *self.get_version_names()]
+        versions = get_versions(*names)
+        last_modified = get_last_modified(*names)
+        period = self.get_version_period()
+        if period:
+            bucket = int(time.time() // period)
+            versions.append(bucket)
+            last_modified = max(last_modified, bucket * period)
+        etag = make_etag(versions, request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            # Свежие изменения могли ещё не дойти до реплики: ответ с ними
+            # получит новый ETag, и старые данные закешируются под ним.
+            fresh = time.time() - last_modified < settings.REPLICA_LAG_SECONDS
+            with primary_reads() if fresh else nullcontext():
+                response = self.versioned_response(
+                    versions, handler, request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def versioned_response(self, versions, handler, request, *args,
+                           **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
 
 
-class MixinViewSet(ListCreateAPIView,
+class CachedResponseMixin(ConditionalGetMixin):
+    """Вдобавок к ETag кеширует сами ответы list и retrieve под ключом
+    из тех же версий данных."""
+
+    def versioned_response(self, versions, handler, request, *args,
+                           **kwargs):
+        cache = get_cache()
+        key = response_key(f'{self.basename}-{self.action}', versions,
+                           request)
+        data = cache.get(key)
+        if data is not None:
+            count(HIT)
+            return Response(data)
+        count(MISS)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class DeferredDestroyMixin:
+    """Объект, у которого больше DELETE_INLINE_LIMIT отзывов и
+    комментариев, помечается удалённым и удаляется в фоне командой
+    purge_deleted; ответ 202 вместо 204. Остальные удаляются в запросе
+    тем же способом, без сигналов на каждый отзыв."""
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if not deletion.is_large(instance):
+            deletion.delete_now(instance)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        deletion.schedule(instance)
+        return Response({'detail': 'Удаление поставлено в очередь'},
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class MixinViewSet(CachedResponseMixin,
+                   ListCreateAPIView,
                    DestroyAPIView,
                    GenericViewSet):
     permission_classes = (IsAdmin,)
@@ -16,3 +179,105 @@ class MixinViewSet(ListCreateAPIView,
 
     def get(self, request, *args, **kwargs):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class BulkCreateAPIView(APIView):
+    """Создание списка объектов одним INSERT в одной транзакции.
+
+    Каждый элемент проверяет item_serializer_class, связи и уникальность
+    для всего пакета проверяет check_items одним-двумя запросами.
+    В ответе результат по каждому элементу в исходном порядке. Если
+    параллельная запись нарушила ограничения БД между проверкой и INSERT,
+    проверка и вставка повторяются до max_attempts раз.
+    """
+    permission_classes = (IsAuthenticated,)
+    item_serializer_class = None
+    result_serializer_class = None
+    model = None
+    max_attempts = 3
+
+    def check_items(self, validated):
+        """Вернуть для каждого элемента объект модели или ошибки."""
+        raise NotImplementedError
+
+    def after_create(self, objects):
+        """Действия над созданными объектами в той же транзакции."""
+
+    def fetch_pks(self, objects):
+        """Проставить id созданным объектам там, где INSERT их не вернул.
+
+        Django 3.2 получает id из bulk_create только на PostgreSQL. На
+        SQLite транзакция держит блокировку записи до конца, поэтому
+        последние len(objects) строк таблицы — вставленные сейчас, в том
+        же порядке. Другие БД не поддерживаются.
+        """
+        alias = router.db_for_write(self.model)
+        features = connections[alias].features
+        if features.can_return_rows_from_bulk_insert:
+            return
+        if connections[alias].vendor != 'sqlite':
+            raise ImproperlyConfigured(
+                'Пакетное создание работает только с PostgreSQL и SQLite')
+        pks = self.model.objects.using(alias).order_by(
+            '-pk').values_list('pk', flat=True)[:len(objects)]
+        for obj, pk in zip(objects, reversed(pks)):
+            obj.pk = pk
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Ожидается непустой список объектов'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {'detail': 'Не больше {} объектов за запрос'.format(
+                    settings.BULK_CREATE_MAX_ITEMS)},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        serializers = [self.item_serializer_class(data=item)
+                       for item in items]
+        valid = [serializer.is_valid() for serializer in serializers]
+        for attempt in range(self.max_attempts):
+            checked = iter(self.check_items([
+                serializer.validated_data
+                for serializer, is_valid in zip(serializers, valid)
+                if is_valid
+            ]))
+            results = [
+                next(checked) if is_valid else serializer.errors
+                for serializer, is_valid in zip(serializers, valid)
+            ]
+            objects = [obj for obj in results if isinstance(obj, self.model)]
+            if not objects:
+                break
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create(objects)
+                    self.fetch_pks(objects)
+                    self.after_create(objects)
+                break
+            except IntegrityError:
+                # Параллельный запрос успел создать такой же объект или
+                # удалить связанный: пакет проверяется заново.
+                continue
+        else:
+            return Response(
+                {'detail': 'Данные изменились во время запроса, '
+                           'повторите его'},
+                status=status.HTTP_409_CONFLICT)
+
+        response = [
+            {'status': status.HTTP_201_CREATED,
+             'data': self.result_serializer_class(result).data}
+            if isinstance(result, self.model)
+            else {'status': status.HTTP_400_BAD_REQUEST, 'errors': result}
+            for result in results
+        ]
+        if len(objects) == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif objects:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(response, status=response_status)
@@ -0,0 +1,115 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу (pub_date, id) без OFFSET и COUNT(*).
+
+    Следующая страница выбирается условием по последней записи текущей,
+    поэтому время ответа не зависит от глубины листания.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = ('-pub_date', '-id') if self.reverse else ('pub_date', 'id')
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(*position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        first, last = (results[0], results[-1]) if results else (None, None)
+        if self.reverse:
+            self.previous_position = first if has_more else None
+            self.next_position = last if position is not None else None
+        else:
+            self.previous_position = first if position is not None else None
+            self.next_position = last if has_more else None
+        return results
+
+    def after(self, pub_date, pk):
+        if self.reverse:
+            return Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+        return Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            direction, pub_date, pk = urlsafe_b64decode(
+                encoded.encode('ascii')).decode('ascii').split('|')
+            position = (parse_datetime(pub_date), int(pk))
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None or direction not in ('n', 'p'):
+            raise NotFound(self.invalid_cursor_message)
+        return position, direction == 'p'
+
+    def encode_cursor(self, obj, reverse):
+        direction = 'p' if reverse else 'n'
+        # Страница может состоять из строк .values() (FastJSONMixin).
+        if isinstance(obj, dict):
+            pub_date, pk = obj['pub_date'], obj['id']
+        else:
+            pub_date, pk = obj.pub_date, obj.pk
+        cursor = f'{direction}|{pub_date.isoformat()}|{pk}'
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            urlsafe_b64encode(cursor.encode('ascii')).decode('ascii')
+        )
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class SelectablePagination(BasePagination):
+    """Постраничная пагинация по умолчанию, по ключу — по запросу клиента:
+    ?pagination=cursor для первой страницы, далее по ссылкам с ?cursor=.
+    """
+    mode_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (KeysetPagination.cursor_query_param in request.query_params
+                or request.query_params.get(self.mode_query_param)
+                == 'cursor'):
+            self.paginator = KeysetPagination()
+        else:
+            self.paginator = PageNumberPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
@@ -1,13 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from rest_framework import exceptions, serializers
 from rest_framework.generics import get_object_or_404
 from rest_framework.validators import UniqueValidator
 
-from reviews.models import Category, Genre, Title, Review, Comment
+from reviews.models import (Category, Genre, LeaderboardEntry, Title, Review,
+                            Comment, ScoreHistogram)
 from users.models import User, ROLES
+from .metrics import TimedSerializerMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериалайзер для пользователей"""
 
     email = serializers.EmailField(max_length=254,
@@ -41,7 +47,7 @@ class UserSerializer(serializers.ModelSerializer):
         return email
 
 
-class AdminSerializer(serializers.ModelSerializer):
+class AdminSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериалайзер для админа"""
 
     email = serializers.EmailField(max_length=254,
@@ -73,21 +79,21 @@ class JWTTokenSerializer(serializers.Serializer):
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """CategorySerializer категории произведений."""
     class Meta:
         model = Category
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """GenreSerializer жанры произведений."""
     class Meta:
         model = Genre
         fields = ('name', 'slug')
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+class TitleCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """TitleCreateSerializer произведения, к которым пишут отзывы."""
     genre = serializers.SlugRelatedField(
         many=True,
@@ -106,7 +112,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """TitleReadSerializer произведения, к которым пишут отзывы."""
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
@@ -119,7 +125,43 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class LeaderboardSerializer(TimedSerializerMixin,
+                            serializers.ModelSerializer):
+    """Сериалайзер места произведения в рейтинговой таблице."""
+    title = TitleReadSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('score', 'title')
+
+
+class ScoreStatsSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """Сериалайзер статистики оценок произведения по гистограмме."""
+    title = serializers.IntegerField(source='title_id')
+    count = serializers.IntegerField(source='total')
+    scores = serializers.DictField(
+        source='counts', child=serializers.IntegerField())
+    mean = serializers.FloatField()
+    median = serializers.FloatField()
+    velocity = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ScoreHistogram
+        fields = ('title', 'count', 'scores', 'mean', 'median', 'velocity')
+
+    def get_velocity(self, obj):
+        """Отзывы за последние TRENDING_DAYS дней и в среднем за день."""
+        days = settings.TRENDING_DAYS
+        reviews = Review.objects.filter(
+            title_id=obj.title_id,
+            pub_date__gte=timezone.now() - timedelta(days=days),
+        ).count()
+        return {'days': days, 'reviews': reviews,
+                'per_day': round(reviews / days, 2)}
+
+
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериалайзер отзывы на произведения."""
 
     author = serializers.SlugRelatedField(
@@ -141,17 +183,25 @@ class ReviewSerializer(serializers.ModelSerializer):
         title_id = (
             self.context['request'].parser_context['kwargs']['title_id']
         )
-        title = get_object_or_404(Title, pk=title_id)
+        title = get_object_or_404(Title.objects.alive(), pk=title_id)
         author = self.context['request'].user
         if (self.context['request'].method == 'POST'
            and Review.objects.filter(title=title, author=author).exists()):
             raise serializers.ValidationError(
                 "Нельзя добавлять больше одного отзыва"
             )
+        data['title'] = title
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewBulkSerializer(serializers.Serializer):
+    """Сериалайзер элемента пакетного создания отзывов."""
+    title = serializers.IntegerField(source='title_id')
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+
+
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериалайзер комментарии к отзывам."""
     author = serializers.SlugRelatedField(
         slug_field="username",
@@ -161,3 +211,9 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'author', 'pub_date', 'text')
+
+
+class CommentBulkSerializer(serializers.Serializer):
+    """Сериалайзер элемента пакетного создания комментариев."""
+    review = serializers.IntegerField(source='review_id')
+    text = serializers.CharField()
@@ -0,0 +1,144 @@
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import (catalogue_rebuilt, leaderboards_rebuilt,
+                             reviews_purged)
+from users.models import User
+from .authentication import user_cache_key
+from .cache import CATALOGUE, bump_on_commit, get_cache
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, **kwargs):
+    bump_on_commit(('category',))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre(sender, **kwargs):
+    bump_on_commit(('genre',))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_on_commit(('title',), ('title', instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_on_commit(('title',), ('title', instance.pk))
+    elif pk_set is None:
+        # genre.title_set.clear(): затронутые произведения неизвестны,
+        # от версии жанров зависят все ответы с произведениями.
+        bump_on_commit(('title',), ('genre',))
+    else:
+        bump_on_commit(
+            ('title',), *(('title', title_id) for title_id in pk_set))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_title_rating(sender, instance, **kwargs):
+    bump_on_commit(
+        ('title',),
+        ('title', instance.title_id),
+        ('reviews', instance.title_id)
+    )
+
+
+@receiver(leaderboards_rebuilt)
+def invalidate_leaderboards(sender, **kwargs):
+    bump_on_commit(('leaderboard',))
+
+
+@receiver(catalogue_rebuilt)
+def invalidate_catalogue(sender, **kwargs):
+    bump_on_commit(CATALOGUE)
+
+
+@receiver(reviews_purged)
+def invalidate_purged(sender, title_ids, review_ids, **kwargs):
+    names = [('comments', review_id) for review_id in review_ids]
+    if title_ids:
+        names.append(('title',))
+        for title_id in title_ids:
+            names.extend((('title', title_id), ('reviews', title_id)))
+    bump_on_commit(*names)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    bump_on_commit(('comments', instance.review_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    key = user_cache_key(instance.pk)
+    # Смена роли должна действовать сразу, поэтому запись удаляется и до,
+    # и после коммита.
+    get_cache().delete(key)
+    transaction.on_commit(partial(get_cache().delete, key))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_content(sender, instance, created, raw, **kwargs):
+    """Имя автора выводится в его отзывах и комментариях: после смены
+    имени сбрасываются только их списки."""
+    loaded_username = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if created or raw or loaded_username == instance.username:
+        return
+    title_ids = Review.objects.filter(author=instance).values_list(
+        'title_id', flat=True).distinct()
+    review_ids = Comment.objects.filter(author=instance).values_list(
+        'review_id', flat=True).distinct()
+    bump_on_commit(
+        *(('reviews', title_id) for title_id in title_ids),
+        *(('comments', review_id) for review_id in review_ids),
+    )
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """Закрыть разорванные постоянные соединения до начала запроса.
+
+    При CONN_MAX_AGE > 0 соединение переживает запрос, и рестарт БД или
+    пулера иначе обнаружился бы ошибкой в первом запросе к ORM. Лишний
+    SELECT 1 делается только для соединений, простоявших без запросов
+    дольше DB_CONN_HEALTH_CHECK_IDLE секунд.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if now < getattr(connection, 'health_check_after', 0):
+            continue
+        if not connection.is_usable():
+            connection.close()
+
+
+@receiver(request_finished)
+def mark_connections_used(sender, **kwargs):
+    """Соединение, только что обслужившее запрос, не проверяется
+    до истечения DB_CONN_HEALTH_CHECK_IDLE."""
+    check_after = time.monotonic() + settings.DB_CONN_HEALTH_CHECK_IDLE
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.health_check_after = check_after
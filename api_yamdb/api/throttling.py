@@ -0,0 +1,114 @@
+import hashlib
+import time
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import PREFIX, get_cache
+from .metrics import registry
+
+registry.describe('yamdb_throttle_total', 'counter',
+                  'Проверки ограничений частоты запросов.')
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Ограничение частоты по скользящему окну на двух счётчиках.
+
+    Число запросов за последние duration секунд оценивается как
+    счётчик текущего окна плюс доля счётчика предыдущего, ещё не
+    вышедшая из скользящего окна. Счётчики лежат в кеше API, поэтому
+    общие для всех воркеров, если кеш общий (REDIS_URL, redis
+    в docker-compose). Запрос сначала атомарно увеличивает счётчик и
+    только потом сравнивает оценку с пределом, отклонённый запрос
+    возвращает счётчик назад: одновременные запросы не проходят
+    сверх предела, прочитав одно и то же значение. Частоты берутся
+    из DEFAULT_THROTTLE_RATES по ключу '<throttle_scope вью>_<kind>'.
+    """
+    kind = None
+    durations = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def get_ident_value(self, request):
+        """Значение, по которому считаются запросы, или None."""
+        raise NotImplementedError
+
+    def parse_rate(self, rate):
+        number, period = rate.split('/')
+        return int(number), self.durations[period[0]]
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}_{self.kind}')
+        value = self.get_ident_value(request) if rate else None
+        if value is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(rate)
+        digest = hashlib.md5(str(value).encode('utf-8')).hexdigest()
+        prefix = f'{PREFIX}:throttle:{scope}:{self.kind}:{digest}'
+
+        now = time.time()
+        window = int(now // self.duration)
+        current_key = f'{prefix}:{window}'
+        self.current = self.increment(current_key) - 1
+        self.previous = get_cache().get(f'{prefix}:{window - 1}', 0)
+        self.elapsed = now / self.duration - window
+        allowed = self.estimate() < self.num_requests
+        if not allowed:
+            self.decrement(current_key)
+        registry.inc('yamdb_throttle_total', {
+            'scope': scope,
+            'kind': self.kind,
+            'result': 'allowed' if allowed else 'throttled',
+        })
+        return allowed
+
+    def estimate(self, elapsed=None):
+        elapsed = self.elapsed if elapsed is None else elapsed
+        return self.previous * (1 - elapsed) + self.current
+
+    def increment(self, key):
+        """Увеличить счётчик и вернуть новое значение."""
+        cache = get_cache()
+        cache.add(key, 0, timeout=self.duration * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Счётчик истёк между add и incr.
+            cache.set(key, 1, timeout=self.duration * 2)
+            return 1
+
+    def decrement(self, key):
+        try:
+            get_cache().decr(key)
+        except ValueError:
+            pass
+
+    def wait(self):
+        """Через сколько секунд оценка опустится ниже предела."""
+        excess = self.estimate() - self.num_requests + 1
+        if self.previous and excess <= self.previous * (1 - self.elapsed):
+            return excess / self.previous * self.duration
+        return (1 - self.elapsed) * self.duration
+
+
+class IPThrottle(SlidingWindowThrottle):
+    kind = 'ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class FieldThrottle(SlidingWindowThrottle):
+    """Считает запросы по значению поля тела запроса без учёта регистра."""
+
+    def get_ident_value(self, request):
+        data = request.data if hasattr(request.data, 'get') else {}
+        value = data.get(self.kind)
+        return value.lower() if isinstance(value, str) and value else None
+
+
+class UsernameThrottle(FieldThrottle):
+    kind = 'username'
+
+
+class EmailThrottle(FieldThrottle):
+    kind = 'email'
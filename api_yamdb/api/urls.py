@@ -1,11 +1,18 @@
 from django.urls import include, path
 from rest_framework import routers
 
+from reviews.models import TRENDING_BOARD
 from .views import (
     APIToken,
+    CacheStats,
     CategoryViewSet,
+    CommentBulkCreate,
     CommentViewSet,
+    Export,
     GenreViewSet,
+    LeaderboardViewSet,
+    Metrics,
+    ReviewBulkCreate,
     ReviewViewSet,
     SignUp,
     TitleViewSet,
@@ -34,5 +41,23 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/signup/', SignUp.as_view(), name='signup'),
     path('v1/auth/token/', APIToken.as_view(), name='token'),
+    path('v1/stats/cache/', CacheStats.as_view(), name='cache_stats'),
+    path('v1/stats/metrics/', Metrics.as_view(), name='metrics'),
+    path('v1/reviews/bulk/', ReviewBulkCreate.as_view(), name='reviews_bulk'),
+    path('v1/comments/bulk/', CommentBulkCreate.as_view(),
+         name='comments_bulk'),
+    path('v1/export/<str:kind>/', Export.as_view(), name='export'),
+    path('v1/leaderboards/top/',
+         LeaderboardViewSet.as_view({'get': 'list'}),
+         name='leaderboard_top'),
+    path('v1/leaderboards/top/genres/<slug:slug>/',
+         LeaderboardViewSet.as_view({'get': 'list'}, board='genre'),
+         name='leaderboard_genre'),
+    path('v1/leaderboards/top/categories/<slug:slug>/',
+         LeaderboardViewSet.as_view({'get': 'list'}, board='category'),
+         name='leaderboard_category'),
+    path('v1/leaderboards/trending/',
+         LeaderboardViewSet.as_view({'get': 'list'}, board=TRENDING_BOARD),
+         name='leaderboard_trending'),
     path('v1/', include(router_v1.urls))
 ]
@@ -1,15 +1,13 @@
-from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.shortcuts import get_object_or_404
 
-from users.models import User
+from users.models import OutgoingEmail
 
 
-def send_confirmation_code_on_email(username, email):
-    user = get_object_or_404(User, username=username)
+def queue_confirmation_code(user):
+    """Поставить письмо с кодом подтверждения в очередь send_emails."""
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(subject='Confirmation code for YaMDb',
-              message=f'Ваш код {confirmation_code}',
-              from_email=settings.DEFAULT_FROM_EMAIL,
-              recipient_list=[email])
+    return OutgoingEmail.objects.create(
+        recipient=user.email,
+        subject='Confirmation code for YaMDb',
+        body=f'Ваш код {confirmation_code}',
+    )
@@ -1,38 +1,59 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.views import APIView
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.export import (CONTENT_TYPES, EXPORTS, FORMATS, NDJSON,
+                            parse_since, render)
+from reviews.models import (TOP_BOARD, Category, Comment, Genre,
+                            LeaderboardEntry, Review, ScoreHistogram, Title,
+                            category_board, genre_board)
 from users.models import User
 from .filters import TitleFilter
+from .metrics import registry
 from .permissions import (IsAdmin,
                           IsAdminOrIsModeratorOrIsUser,
                           IsAdminOrReadOnly)
 
-from .mixins import MixinViewSet
+from .cache import bump_on_commit, get_stats
+from .mixins import (BulkCreateAPIView, CachedResponseMixin,
+                     ConditionalGetMixin, DeferredDestroyMixin,
+                     FastJSONMixin, MixinViewSet, ReplicaReadMixin)
+from .pagination import SelectablePagination
+from .row_serializers import (CommentRowSerializer, ReviewRowSerializer,
+                              TitleRowSerializer)
 from .serializers import (AdminSerializer,
                           CategorySerializer,
+                          CommentBulkSerializer,
                           CommentSerializer,
                           GenreSerializer,
                           JWTTokenSerializer,
+                          LeaderboardSerializer,
+                          ReviewBulkSerializer,
                           ReviewSerializer,
+                          ScoreStatsSerializer,
                           TitleCreateSerializer,
                           TitleReadSerializer,
                           UserSerializer)
-from .utils import send_confirmation_code_on_email
+from .throttling import EmailThrottle, IPThrottle, UsernameThrottle
+from .utils import queue_confirmation_code
 
 
 class SignUp(APIView):
     """Вьюкласс для регистрации пользователей"""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle, EmailThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = UserSerializer(data=request.data)
@@ -42,19 +63,18 @@ class SignUp(APIView):
         ).first()
 
         if user:
-            send_confirmation_code_on_email(user.username, user.email)
+            queue_confirmation_code(user)
 
             return Response(status=status.HTTP_200_OK)
 
         if serializer.is_valid():
             try:
-                User.objects.get_or_create(
+                user, _ = User.objects.get_or_create(
                     username=serializer.data.get('username'),
                     email=serializer.data.get('email'))
             except Exception:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            send_confirmation_code_on_email(
-                serializer.data['username'], serializer.data['email'])
+            queue_confirmation_code(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -63,6 +83,8 @@ class APIToken(APIView):
     """Вьюкласс для получения токена"""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = JWTTokenSerializer(data=request.data)
@@ -81,7 +103,52 @@ class APIToken(APIView):
                 status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class CacheStats(APIView):
+    """Вьюкласс счётчиков попаданий в кеш ответов"""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+class Metrics(APIView):
+    """Вьюкласс метрик производительности в формате Prometheus"""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return HttpResponse(registry.render(),
+                            content_type='text/plain; version=0.0.4')
+
+
+class Export(APIView):
+    """Вьюкласс потоковой выгрузки произведений, отзывов и комментариев
+    в NDJSON (?output=ndjson) или CSV (?output=csv), для отзывов
+    и комментариев — начиная с ?since=."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, kind):
+        output_format = request.query_params.get('output', NDJSON)
+        if kind not in EXPORTS or output_format not in FORMATS:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        try:
+            since = parse_since(request.query_params.get('since'))
+        except ValueError as error:
+            return Response({'since': [str(error)]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            render(EXPORTS[kind](since), output_format),
+            content_type=CONTENT_TYPES[output_format])
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{output_format}"')
+        # nginx не должен накапливать выгрузку в буфере целиком.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class UserViewSet(DeferredDestroyMixin, viewsets.ModelViewSet):
     """Вьюсет для работы админа с пользователями"""
 
     queryset = User.objects.all()
@@ -95,12 +162,16 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=('get', 'patch'),
             url_name='me', permission_classes=(IsAuthenticated,))
     def me(self, request):
+        user = get_object_or_404(User, pk=request.user.pk)
+        if request.method == 'GET':
+            return Response(
+                AdminSerializer(user).data, status=status.HTTP_200_OK)
         serializer = AdminSerializer(
-            request.user,
+            user,
             data=request.data,
             partial=True)
         if serializer.is_valid():
-            serializer.save(role=self.request.user.role)
+            serializer.save(role=user.role)
 
             return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -111,6 +182,7 @@ class CategoryViewSet(MixinViewSet):
     """CategoryViewSet категории произведений."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_tables = ('category',)
     permission_classes = (IsAdminOrReadOnly,)
 
 
@@ -118,13 +190,18 @@ class GenreViewSet(MixinViewSet):
     """GenreViewSet жанры произведений."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_tables = ('genre',)
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ReplicaReadMixin, CachedResponseMixin, FastJSONMixin,
+                   DeferredDestroyMixin, viewsets.ModelViewSet):
     """TitleViewSet произведения, к которым пишут отзывы."""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+    queryset = Title.objects.alive().select_related(
+        'category').prefetch_related('genre')
+    cache_tables = ('title', 'category', 'genre')
+    cache_object = 'title'
+    row_serializer_class = TitleRowSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitleFilter
@@ -132,34 +209,184 @@ class TitleViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
+        if self.action == 'stats':
+            return ScoreStatsSerializer
         return TitleCreateSerializer
 
+    def get_version_names(self):
+        if self.action == 'stats':
+            return [('title', self.kwargs['pk'])]
+        return super().get_version_names()
+
+    def get_version_period(self):
+        # Отзывы выбывают из окна velocity без изменения данных.
+        if self.action == 'stats':
+            return settings.STATS_VELOCITY_PERIOD
+        return None
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Распределение оценок 1–10, среднее, медиана и число недавних
+        отзывов. Берётся из гистограммы произведения, а не из отзывов."""
+        return self.conditional_response(self.get_stats, request, pk=pk)
+
+    def get_stats(self, request, pk):
+        title = get_object_or_404(
+            Title.objects.alive().select_related('score_histogram').only(
+                'pk', 'score_histogram'), pk=pk)
+        try:
+            histogram = title.score_histogram
+        except ScoreHistogram.DoesNotExist:
+            histogram = ScoreHistogram(title=title)
+        return Response(self.get_serializer(histogram).data)
+
+
+class LeaderboardViewSet(ReplicaReadMixin, CachedResponseMixin,
+                         mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Рейтинговые таблицы: лучшие произведения в целом, в жанре или
+    категории и популярные по числу недавних отзывов. Размер выдачи
+    задаёт ?limit=."""
+    serializer_class = LeaderboardSerializer
+    permission_classes = (AllowAny,)
+    pagination_class = None
+    cache_tables = ('title', 'category', 'genre', 'leaderboard')
+    basename = 'leaderboard'
+    board = TOP_BOARD
+
+    def get_board_name(self):
+        if self.board == 'genre':
+            genre = get_object_or_404(Genre, slug=self.kwargs['slug'])
+            return genre_board(genre.pk)
+        if self.board == 'category':
+            category = get_object_or_404(Category, slug=self.kwargs['slug'])
+            return category_board(category.pk)
+        return self.board
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get(
+                'limit', settings.LEADERBOARD_LIMIT))
+        except ValueError:
+            limit = settings.LEADERBOARD_LIMIT
+        return min(max(limit, 1), settings.LEADERBOARD_MAX_LIMIT)
+
+    def get_queryset(self):
+        return LeaderboardEntry.objects.board(
+            self.get_board_name()
+        ).select_related('title__category').prefetch_related(
+            'title__genre')[:self.get_limit()]
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, ConditionalGetMixin, FastJSONMixin,
+                    viewsets.ModelViewSet):
     """ReviewViewSet отзывы на произведения."""
     serializer_class = ReviewSerializer
+    row_serializer_class = ReviewRowSerializer
     permission_classes = (IsAdminOrIsModeratorOrIsUser,)
+    pagination_class = SelectablePagination
+
+    def get_version_names(self):
+        title_id = self.kwargs.get("title_id")
+        return [('reviews', title_id), ('title', title_id)]
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        title = get_object_or_404(
+            Title.objects.alive(), pk=self.kwargs.get("title_id"))
+        return title.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, ConditionalGetMixin, FastJSONMixin,
+                     viewsets.ModelViewSet):
     """CommentViewSet комментарии к отзывам."""
     serializer_class = CommentSerializer
+    row_serializer_class = CommentRowSerializer
     permission_classes = (IsAdminOrIsModeratorOrIsUser,)
+    pagination_class = SelectablePagination
+
+    def get_version_names(self):
+        # Фоновое удаление произведения сбрасывает только его версию.
+        return [('comments', self.kwargs.get("review_id")),
+                ('title', self.kwargs.get("title_id"))]
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        review = get_object_or_404(
+            Review.objects.alive(), pk=self.kwargs.get("review_id"))
+        return review.comments.select_related('author')
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get("title_id")
         review_id = self.kwargs.get("review_id")
-        review = get_object_or_404(Review, pk=review_id, title=title_id)
+        review = get_object_or_404(
+            Review.objects.alive(), pk=review_id, title=title_id)
         serializer.save(author=self.request.user, review=review)
+
+
+class ReviewBulkCreate(BulkCreateAPIView):
+    """Пакетное создание отзывов текущего пользователя на разные
+    произведения."""
+    item_serializer_class = ReviewBulkSerializer
+    result_serializer_class = ReviewSerializer
+    model = Review
+
+    def check_items(self, validated):
+        title_ids = {item['title_id'] for item in validated}
+        titles = Title.objects.alive().only(
+            'name').in_bulk(title_ids)
+        reviewed = set(Review.objects.filter(
+            author=self.request.user, title_id__in=title_ids
+        ).values_list('title_id', flat=True))
+        results = []
+        for item in validated:
+            title = titles.get(item['title_id'])
+            if title is None:
+                results.append({'title': ['Произведение не найдено']})
+            elif title.pk in reviewed:
+                results.append(
+                    {'title': ['Нельзя добавлять больше одного отзыва']})
+            else:
+                reviewed.add(title.pk)
+                results.append(Review(
+                    title=title, author=self.request.user,
+                    text=item['text'], score=item['score']))
+        return results
+
+    def after_create(self, objects):
+        # bulk_create не отправляет сигналы: рейтинг и кеш обновляются здесь
+        scores = defaultdict(lambda: [0, 0])
+        for review in objects:
+            scores[review.title_id][0] += review.score
+            scores[review.title_id][1] += 1
+        for title_id, (score_sum, score_count) in scores.items():
+            Title.objects.apply_score(title_id, score_sum, score_count)
+        ScoreHistogram.objects.refresh(scores)
+        LeaderboardEntry.objects.refresh(scores)
+        bump_on_commit(('title',), *(
+            (name, title_id)
+            for title_id in scores for name in ('title', 'reviews')
+        ))
+
+
+class CommentBulkCreate(BulkCreateAPIView):
+    """Пакетное создание комментариев текущего пользователя."""
+    item_serializer_class = CommentBulkSerializer
+    result_serializer_class = CommentSerializer
+    model = Comment
+
+    def check_items(self, validated):
+        reviews = set(Review.objects.alive().filter(
+            pk__in={item['review_id'] for item in validated},
+        ).values_list('pk', flat=True))
+        return [
+            Comment(review_id=item['review_id'], author=self.request.user,
+                    text=item['text'])
+            if item['review_id'] in reviews
+            else {'review': ['Отзыв не найден']}
+            for item in validated
+        ]
+
+    def after_create(self, objects):
+        bump_on_commit(*{('comments', comment.review_id)
+                         for comment in objects})
@@ -0,0 +1,66 @@
+"""Прогрев приложения до приёма запросов.
+
+Django и DRF многое делают лениво: заполняют URL-резолверы, кеши _meta
+моделей, импортируют классы из строк настроек, загружают каталоги
+переводов при первом запросе. warm_up делает это заранее, без запросов
+к БД. Поля сериализаторов и формы фильтров строятся заново для каждого
+экземпляра, поэтому их прогрев ничего не сохраняет и здесь не делается.
+С preload_app gunicorn вызывает warm_up в мастере, и воркеры получают всё
+готовым через copy-on-write (см. gunicorn.conf.py).
+"""
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import get_resolver
+from django.utils import translation
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+logger = logging.getLogger('api.performance')
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.resolve('/api/v1/titles/')
+
+
+def warm_models():
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta.fields_map
+
+
+def warm_settings():
+    for module_settings in (api_settings, jwt_settings):
+        for name in module_settings.import_strings:
+            getattr(module_settings, name)
+
+
+def warm_translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('This field is required.')
+
+
+STEPS = (
+    ('urls', warm_urls),
+    ('models', warm_models),
+    ('settings', warm_settings),
+    ('translations', warm_translations),
+)
+
+
+def warm_up():
+    """Выполнить все шаги прогрева; ошибка шага только пишется в лог.
+    Возвращает время каждого шага в секундах."""
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Прогрев %s не удался', name)
+        timings[name] = time.perf_counter() - started
+    return timings
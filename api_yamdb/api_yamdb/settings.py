@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'reviews.apps.ReviewsConfig',
@@ -34,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,10 +75,69 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv(
+            'DB_DISABLE_SERVER_SIDE_CURSORS', default='False') == 'True',
     }
 }
 
+# Реплики только для чтения: DB_REPLICA_HOSTS — хосты (host или host:port),
+# DB_REPLICA_NAMES — имена баз, если отличаются от основной.
+_replica_hosts = [
+    host for host in os.getenv('DB_REPLICA_HOSTS', default='').split(',')
+    if host
+]
+_replica_names = [
+    name for name in os.getenv('DB_REPLICA_NAMES', default='').split(',')
+    if name
+]
+REPLICA_DATABASES = []
+for _index in range(max(len(_replica_hosts), len(_replica_names))):
+    _replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if _index < len(_replica_hosts):
+        _host, _, _port = _replica_hosts[_index].partition(':')
+        _replica.update(HOST=_host, PORT=_port or _replica['PORT'])
+    if _index < len(_replica_names):
+        _replica['NAME'] = _replica_names[_index]
+    DATABASES[f'replica{_index + 1}'] = _replica
+    REPLICA_DATABASES.append(f'replica{_index + 1}')
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+REPLICA_LAG_SECONDS = int(os.getenv('REPLICA_LAG_SECONDS', default=5))
+
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', default='True') == 'True'
+# Проверяются только соединения, простоявшие без запросов дольше этого.
+DB_CONN_HEALTH_CHECK_IDLE = int(
+    os.getenv('DB_CONN_HEALTH_CHECK_IDLE', default=30))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', default='default')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=60))
+# Версии данных для ETag и ключей кеша ответов. В общем кеше живут
+# бессрочно; в кеше процесса, куда не доходят изменения из других
+# процессов, — не дольше API_VERSION_TIMEOUT секунд.
+API_VERSION_TIMEOUT = None if os.getenv('REDIS_URL') else int(
+    os.getenv('API_VERSION_TIMEOUT', default=60))
+AUTH_USER_CACHE_TIMEOUT = int(
+    os.getenv('AUTH_USER_CACHE_TIMEOUT', default=30))
+
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', default='russian')
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,15 +181,56 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication', ],
+        'api.authentication.CachedJWTAuthentication', ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 5, }
+    'PAGE_SIZE': 5,
+    # Регистрация и получение токена: ограничения по IP, имени и почте.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', default='10/m'),
+        'signup_username': '3/m',
+        'signup_email': '3/m',
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', default='30/m'),
+        'token_username': '10/m',
+    },
+    # Адрес клиента — последний в X-Forwarded-For, который ставит nginx.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)), }
+
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Списки произведений, отзывов и комментариев через .values() и orjson.
+FAST_JSON = os.getenv('FAST_JSON', default='False') == 'True'
+
+# Окно таблицы популярных произведений и размер выдачи рейтингов.
+TRENDING_DAYS = int(os.getenv('TRENDING_DAYS', default=7))
+# Как часто обновляется velocity в статистике оценок, секунды.
+STATS_VELOCITY_PERIOD = int(os.getenv('STATS_VELOCITY_PERIOD', default=600))
+LEADERBOARD_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
+
+PERFORMANCE_METRICS = os.getenv(
+    'PERFORMANCE_METRICS', default='True') == 'True'
+QUERY_COUNT_BUDGET = int(os.getenv('QUERY_COUNT_BUDGET', default=20))
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND',
+    default='django.core.mail.backends.filebased.EmailBackend')
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_FROM_EMAIL = 'test@localhost'
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', default=100))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', default=5))
+EMAIL_RETRY_DELAY = int(os.getenv('EMAIL_RETRY_DELAY', default=30))
+
+# Произведения и пользователи, у которых отзывов и комментариев больше
+# DELETE_INLINE_LIMIT, удаляются в фоне (purge_deleted) пачками.
+DELETE_INLINE_LIMIT = int(os.getenv('DELETE_INLINE_LIMIT', default=1000))
+DELETE_BATCH_SIZE = int(os.getenv('DELETE_BATCH_SIZE', default=1000))
+
+# В админке таблицы без фильтра, где по статистике PostgreSQL строк больше
+# ADMIN_ESTIMATED_COUNT_FROM, считаются по оценке вместо COUNT(*).
+ADMIN_ESTIMATED_COUNT_FROM = int(
+    os.getenv('ADMIN_ESTIMATED_COUNT_FROM', default=100000))
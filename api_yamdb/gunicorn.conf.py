@@ -0,0 +1,65 @@
+"""Настройки gunicorn, переопределяются переменными окружения.
+
+Воркеры синхронные, с GUNICORN_THREADS больше 1 — потоковые (gthread).
+Режима ASGI нет: в Django 3.2 ORM только синхронный, а ASGIHandler
+выполняет синхронные вью через sync_to_async(thread_sensitive=True)
+в одном общем потоке, так что воркеры uvicorn не обслуживали бы запросы
+параллельно. Асинхронные вью для чтения появятся вместе с переходом
+на Django 4.1+.
+
+С GUNICORN_PRELOAD (по умолчанию включено) приложение импортируется
+и прогревается (api.warmup) один раз в мастере до запуска воркеров:
+воркеры стартуют быстрее и делят память мастера copy-on-write.
+"""
+import gc
+import os
+
+wsgi_app = 'api_yamdb.wsgi:application'
+worker_class = 'sync'
+threads = int(os.getenv('GUNICORN_THREADS', default=1))
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', default=1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+# Больше keepalive_timeout в upstream nginx (60 с): соединение закрывает
+# nginx, а не gunicorn. Учитывается потоковыми воркерами (gthread).
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=75))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', default='True') == 'True'
+WARM_UP = os.getenv('GUNICORN_WARM_UP', default='True') == 'True'
+# Перезапуск воркера после стольких запросов ограничивает рост памяти;
+# разброс не даёт всем воркерам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = int(
+    os.getenv('GUNICORN_MAX_REQUESTS_JITTER', default=100))
+
+
+def warm_up(log):
+    from api.warmup import warm_up
+
+    timings = warm_up()
+    log.info('Прогрев: %s', ', '.join(
+        f'{name} {seconds * 1000:.1f} мс'
+        for name, seconds in timings.items()))
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    if WARM_UP:
+        warm_up(server.log)
+    # Соединения мастера не должны достаться воркерам после fork.
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+    # Объекты, созданные до fork, сборщик мусора больше не обходит:
+    # иначе он трогает их заголовки и страницы копируются в каждый воркер.
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    if not preload_app and WARM_UP:
+        warm_up(worker.log)
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.paginator import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без точного COUNT(*) по всей таблице."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -11,8 +18,10 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('name', 'slug',)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('id', 'text', 'review', 'author', 'pub_date')
+    list_select_related = ('review', 'author')
+    autocomplete_fields = ('review', 'author')
 
 
 class GenreAdmin(admin.ModelAdmin):
@@ -23,19 +32,24 @@ class GenreAdmin(admin.ModelAdmin):
     search_fields = ('name', 'slug',)
 
 
-class ReviewsAdmin(admin.ModelAdmin):
+class ReviewsAdmin(LargeTableAdmin):
     list_display = ('id', 'text', 'title', 'author', 'pub_date', 'score')
+    list_select_related = ('title', 'author')
+    autocomplete_fields = ('title', 'author')
+    search_fields = ('^title__name', '=author__username')
 
 
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(LargeTableAdmin):
     list_display = (
         'name',
         'year',
         'description',
         'category',
     )
-    filter_horizontal = ('genre',)
-    search_fields = ('name', 'year', 'genre', 'category',)
+    list_select_related = ('category',)
+    list_filter = ('category', 'genre')
+    autocomplete_fields = ('genre', 'category')
+    search_fields = ('name', 'year',)
     empty_value_display = '-пусто-'
 
 
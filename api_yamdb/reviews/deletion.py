@@ -0,0 +1,151 @@
+"""Удаление произведений и пользователей с большим числом отзывов
+и комментариев.
+
+Каскадное удаление Django сначала загружает в память все зависимые
+объекты и держит блокировки до конца транзакции. Поэтому такие объекты
+только помечаются удалёнными и ставятся в очередь PendingDeletion,
+а команда purge_deleted удаляет комментарии и отзывы пачками по
+batch_size строк в отдельных транзакциях, без сигналов, и только затем
+сам объект.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from users.models import User
+from .models import (Comment, LeaderboardEntry, PendingDeletion, Review,
+                     ScoreHistogram, Title)
+from .signals import reviews_purged
+
+KINDS = {Title: PendingDeletion.TITLE, User: PendingDeletion.USER}
+
+
+def dependents(obj):
+    """Запросы ко всем отзывам и комментариям, удаляемым вместе с obj."""
+    if isinstance(obj, Title):
+        return (Review.objects.filter(title=obj),
+                Comment.objects.filter(review__title=obj))
+    return (Review.objects.filter(author=obj),
+            Comment.objects.filter(author=obj),
+            Comment.objects.filter(review__author=obj))
+
+
+def is_large(obj, limit=None):
+    """Больше ли limit (DELETE_INLINE_LIMIT) зависимых строк у obj.
+    Каждый запрос считает не больше limit + 1 строки."""
+    limit = settings.DELETE_INLINE_LIMIT if limit is None else limit
+    total = 0
+    for queryset in dependents(obj):
+        total += queryset.order_by()[:limit + 1 - total].count()
+        if total > limit:
+            return True
+    return False
+
+
+def schedule(obj):
+    """Пометить obj удалённым и поставить в очередь purge_deleted.
+    Произведение скрывается из API, пользователь деактивируется."""
+    with transaction.atomic():
+        if isinstance(obj, Title):
+            obj.is_deleted = True
+            obj.save(update_fields=('is_deleted',))
+        else:
+            obj.is_active = False
+            obj.save(update_fields=('is_active',))
+        PendingDeletion.objects.get_or_create(
+            kind=KINDS[type(obj)], object_id=obj.pk)
+
+
+def delete_in_batches(queryset, batch_size, fields=(), after=None):
+    """Удалить строки queryset пачками без загрузки моделей и сигналов.
+
+    after(rows) вызывается в транзакции пачки после удаления и получает
+    кортежи (pk, *fields) удалённых строк. Строки пачки блокируются
+    с SKIP LOCKED, так что параллельный воркер их не учтёт дважды.
+    Возвращает число удалённых строк.
+    """
+    model = queryset.model
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update(skip_locked=True, of=('self',))
+                .order_by('pk').values_list('pk', *fields)[:batch_size])
+            if not rows:
+                return total
+            batch = model.objects.filter(pk__in=[row[0] for row in rows])
+            # Комментарии, добавленные к отзывам пачки после прохода по
+            # комментариям, иначе нарушили бы внешний ключ.
+            if model is Review:
+                replies = Comment.objects.filter(review__in=batch)
+                replies._raw_delete(replies.db)
+            batch._raw_delete(batch.db)
+            if after is not None:
+                after(rows)
+        total += len(rows)
+
+
+def remove_scores(rows):
+    """Исключить оценки удалённых отзывов (pk, title_id, score)."""
+    scores = defaultdict(lambda: [0, 0])
+    for _, title_id, score in rows:
+        scores[title_id][0] += score
+        scores[title_id][1] += 1
+    for title_id, (score_sum, score_count) in scores.items():
+        Title.objects.apply_score(title_id, -score_sum, -score_count)
+    ScoreHistogram.objects.refresh(scores)
+    LeaderboardEntry.objects.refresh(scores)
+    reviews_purged.send(sender=Review, title_ids=set(scores),
+                        review_ids={row[0] for row in rows})
+
+
+def comments_removed(rows):
+    reviews_purged.send(sender=Comment, title_ids=set(),
+                        review_ids={review_id for _, review_id in rows})
+
+
+def purge_title(title_id, batch_size):
+    """Удалить помеченное произведение; рейтинг у него уже не нужен."""
+    deleted = delete_in_batches(
+        Comment.objects.filter(review__title_id=title_id), batch_size)
+    deleted += delete_in_batches(
+        Review.objects.filter(title_id=title_id), batch_size)
+    Title.objects.filter(pk=title_id).delete()
+    return deleted
+
+
+def purge_user(user_id, batch_size):
+    """Удалить пользователя, пересчитывая рейтинги затронутых
+    произведений по каждой пачке его отзывов."""
+    deleted = delete_in_batches(
+        Comment.objects.filter(author_id=user_id), batch_size,
+        fields=('review_id',), after=comments_removed)
+    deleted += delete_in_batches(
+        Comment.objects.filter(review__author_id=user_id), batch_size)
+    deleted += delete_in_batches(
+        Review.objects.filter(author_id=user_id), batch_size,
+        fields=('title_id', 'score'), after=remove_scores)
+    User.objects.filter(pk=user_id).delete()
+    return deleted
+
+
+PURGERS = {
+    PendingDeletion.TITLE: purge_title,
+    PendingDeletion.USER: purge_user,
+}
+
+
+def delete_now(obj):
+    """Удалить небольшой obj в запросе так же, как purge_deleted: отзывы
+    и комментарии без сигналов, рейтинги и таблицы пересчитываются один
+    раз на произведение, а не на каждый отзыв."""
+    with transaction.atomic():
+        PURGERS[KINDS[type(obj)]](obj.pk, settings.DELETE_INLINE_LIMIT + 1)
+
+
+def purge(task, batch_size):
+    """Выполнить задачу очереди и удалить её; число удалённых строк."""
+    deleted = PURGERS[task.kind](task.object_id, batch_size)
+    task.delete()
+    return deleted
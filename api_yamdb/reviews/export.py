@@ -0,0 +1,142 @@
+import csv
+from collections import defaultdict
+from datetime import datetime, time
+from itertools import islice
+
+import orjson
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, Review, Title
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+FORMATS = (NDJSON, CSV)
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+CHUNK_SIZE = 2000
+
+
+def parse_since(value):
+    """Дата или дата со временем из ISO 8601; без пояса — в TIME_ZONE."""
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        since = datetime.combine(day, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def title_rows(since=None, chunk_size=CHUNK_SIZE):
+    # У произведений нет даты публикации: выгружаются всегда целиком.
+    fields = ('id', 'name', 'year', 'description', 'category__slug',
+              'rating', 'score_count')
+    titles = Title.objects.alive().order_by(
+        'pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    for chunk in _chunks(titles, chunk_size):
+        genres = defaultdict(list)
+        for title_id, slug in Title.genre.through.objects.filter(
+            title_id__in=[row[0] for row in chunk]
+        ).order_by('genre__slug').values_list('title_id', 'genre__slug'):
+            genres[title_id].append(slug)
+        for row in chunk:
+            yield {
+                'id': row[0],
+                'name': row[1],
+                'year': row[2],
+                'description': row[3],
+                'category': row[4],
+                'genre': genres[row[0]],
+                'rating': row[5],
+                'score_count': row[6],
+            }
+
+
+def _dated_rows(queryset, fields, since, chunk_size):
+    if since is not None:
+        queryset = queryset.filter(pub_date__gt=since)
+    rows = queryset.order_by('pub_date', 'pk').values_list(
+        *fields.values()).iterator(chunk_size=chunk_size)
+    names = tuple(fields)
+    for row in rows:
+        yield dict(zip(names, row))
+
+
+def review_rows(since=None, chunk_size=CHUNK_SIZE):
+    return _dated_rows(Review.objects.alive(), {
+        'id': 'id',
+        'title': 'title_id',
+        'author': 'author__username',
+        'score': 'score',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }, since, chunk_size)
+
+
+def comment_rows(since=None, chunk_size=CHUNK_SIZE):
+    comments = Comment.objects.alive()
+    return _dated_rows(comments, {
+        'id': 'id',
+        'title': 'review__title_id',
+        'review': 'review_id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }, since, chunk_size)
+
+
+EXPORTS = {
+    'titles': title_rows,
+    'reviews': review_rows,
+    'comments': comment_rows,
+}
+
+
+class _Line:
+    """Файлоподобный объект для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ','.join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def render(rows, output_format, chunk_size=CHUNK_SIZE):
+    """Строки выгрузки в NDJSON или CSV, по одному блоку байт на пачку
+    из chunk_size записей."""
+    writer = csv.writer(_Line()) if output_format == CSV else None
+    header_written = False
+    for chunk in _chunks(rows, chunk_size):
+        if writer is None:
+            yield b''.join(orjson.dumps(row) + b'\n' for row in chunk)
+            continue
+        lines = []
+        if not header_written:
+            lines.append(writer.writerow(chunk[0].keys()))
+            header_written = True
+        for row in chunk:
+            lines.append(writer.writerow([
+                _csv_value(value) for value in row.values()]))
+        yield ''.join(lines).encode('utf-8')
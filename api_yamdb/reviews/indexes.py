@@ -0,0 +1,13 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class GinIndexWithFallback(GinIndex):
+    """GIN-индекс на PostgreSQL и обычный индекс на остальных СУБД,
+    чтобы схема создавалась и в тестах на SQLite."""
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().create_sql(model, schema_editor, using, **kwargs)
+        return models.Index.create_sql(
+            self, model, schema_editor, using, **kwargs)
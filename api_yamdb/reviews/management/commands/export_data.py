@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import (CHUNK_SIZE, EXPORTS, FORMATS, NDJSON,
+                            parse_since, render)
+
+
+class Command(BaseCommand):
+    help = ('Выгружает произведения, отзывы или комментарии в NDJSON или '
+            'CSV потоком, не загружая данные в память целиком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=tuple(EXPORTS))
+        parser.add_argument(
+            '--format', dest='output_format', choices=FORMATS,
+            default=NDJSON, help='Формат выгрузки.')
+        parser.add_argument(
+            '--since',
+            help='Только отзывы и комментарии, опубликованные позже этой '
+                 'даты (ISO 8601).')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько строк читать с сервера БД за раз.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным')
+        try:
+            since = parse_since(options['since'])
+        except ValueError as error:
+            raise CommandError(error)
+        rows = EXPORTS[options['kind']](since, options['chunk_size'])
+        chunks = render(rows, options['output_format'],
+                        options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            return
+        for chunk in chunks:
+            self.stdout.write(chunk.decode('utf-8'), ending='')
@@ -0,0 +1,210 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.management.commands.import_csv import keep_auto_now_add
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, ScoreHistogram, Title)
+from reviews.signals import catalogue_rebuilt, leaderboards_rebuilt
+from users.models import User
+
+PREFIX = 'bench'
+WORDS = (
+    'тень', 'ветер', 'город', 'море', 'звезда', 'ночь', 'дорога', 'сад',
+    'огонь', 'песня', 'зима', 'остров', 'время', 'память', 'небо', 'лес',
+)
+MANIFEST_SAMPLE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными заданного объёма для '
+            'нагрузочного тестирования (benchmarks/scenarios.py).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--users', type=int, default=200,
+                            help='Авторы отзывов и комментариев.')
+        parser.add_argument('--writers', type=int, default=50,
+                            help='Пользователи без отзывов для сценария '
+                                 'публикации отзыва.')
+        parser.add_argument('--reviews-per-title', type=int, default=10,
+                            help='Среднее число отзывов на произведение.')
+        parser.add_argument('--comments-per-review', type=int, default=1,
+                            help='Среднее число комментариев на отзыв.')
+        parser.add_argument('--days', type=int, default=60,
+                            help='За сколько дней разбросать даты отзывов.')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true',
+                            help='Удалить ранее сгенерированные данные.')
+        parser.add_argument('--manifest',
+                            help='Куда записать JSON с id и токенами для '
+                                 'сценариев нагрузки.')
+
+    def handle(self, *args, **options):
+        if options['reviews_per_title'] * 2 > options['users']:
+            raise CommandError(
+                '--users должно быть не меньше 2 * --reviews-per-title: '
+                'у отзывов на одно произведение разные авторы')
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        started = time.monotonic()
+        with transaction.atomic():
+            if options['clear']:
+                self.clear()
+            genres = self.create_slugged(Genre, options['genres'], 'жанр')
+            categories = self.create_slugged(
+                Category, options['categories'], 'категория')
+            users = self.create_users('user', options['users'])
+            writers = self.create_users('writer', options['writers'])
+            titles = self.create_titles(genres, categories)
+            reviews = self.create_reviews(titles, users)
+            self.create_comments(reviews, users)
+            self.reset_sequences()
+            Title.objects.rebuild_scores()
+            Title.objects.update_search_vector()
+            ScoreHistogram.objects.rebuild()
+            LeaderboardEntry.objects.rebuild()
+            leaderboards_rebuilt.send(sender=LeaderboardEntry)
+            catalogue_rebuilt.send(sender=Title)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: произведений {len(titles)}, отзывов {len(reviews)}, '
+            f'пользователей {len(users) + len(writers)} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
+        if options['manifest']:
+            self.write_manifest(titles, genres, reviews, writers)
+
+    def clear(self):
+        titles = Title.objects.filter(name__startswith=f'{PREFIX} ')
+        # Отзывы и комментарии удаляются одним запросом без сигналов:
+        # рейтинги и лидерборды всё равно пересчитываются в конце.
+        for queryset in (Comment.objects.filter(review__title__in=titles),
+                         Review.objects.filter(title__in=titles)):
+            queryset._raw_delete(queryset.db)
+        titles.delete()
+        Genre.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+        Category.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+        User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+
+    def next_ids(self, model, count):
+        start = (model.objects.aggregate(value=Max('pk'))['value'] or 0) + 1
+        return range(start, start + count)
+
+    def insert(self, model, objects):
+        with keep_auto_now_add(model):
+            model.objects.bulk_create(
+                objects, batch_size=self.options['batch_size'])
+
+    def create_slugged(self, model, count, name):
+        objects = [
+            model(id=pk, name=f'{name} {pk}',
+                  slug=f'{PREFIX}-{model._meta.model_name}-{pk}')
+            for pk in self.next_ids(model, count)
+        ]
+        self.insert(model, objects)
+        return objects
+
+    def create_users(self, kind, count):
+        password = make_password(None)
+        users = [
+            User(id=pk, username=f'{PREFIX}_{kind}_{pk}',
+                 email=f'{PREFIX}_{kind}_{pk}@yamdb.fake', password=password)
+            for pk in self.next_ids(User, count)
+        ]
+        self.insert(User, users)
+        return users
+
+    def create_titles(self, genres, categories):
+        titles = [
+            Title(
+                id=pk,
+                name='{} {} {}'.format(
+                    PREFIX, ' '.join(self.random.sample(WORDS, 2)), pk),
+                year=self.random.randint(1950, self.now.year),
+                description=' '.join(self.random.choices(WORDS, k=12)),
+                category=self.random.choice(categories) if categories
+                else None,
+            )
+            for pk in self.next_ids(Title, self.options['titles'])
+        ]
+        self.insert(Title, titles)
+        through = Title.genre.through
+        self.insert(through, [
+            through(title_id=title.pk, genre_id=genre.pk)
+            for title in titles
+            for genre in self.random.sample(
+                genres, min(len(genres), self.random.randint(1, 3)))
+        ])
+        return titles
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=self.random.randint(0, self.options['days'] * 86400))
+
+    def create_reviews(self, titles, users):
+        average = self.options['reviews_per_title']
+        ids = iter(self.next_ids(Review, len(titles) * average * 2))
+        reviews = [
+            Review(id=next(ids), title_id=title.pk, author_id=author.pk,
+                   text=' '.join(self.random.choices(WORDS, k=30)),
+                   score=self.random.randint(1, 10),
+                   pub_date=self.random_date())
+            for title in titles
+            for author in self.random.sample(
+                users, self.random.randint(0, average * 2))
+        ]
+        self.insert(Review, reviews)
+        return reviews
+
+    def create_comments(self, reviews, users):
+        average = self.options['comments_per_review']
+        ids = iter(self.next_ids(Comment, len(reviews) * average * 2))
+        self.insert(Comment, [
+            Comment(id=next(ids), review_id=review.pk,
+                    author_id=self.random.choice(users).pk,
+                    text=' '.join(self.random.choices(WORDS, k=10)),
+                    pub_date=max(review.pub_date, self.random_date()))
+            for review in reviews
+            for _ in range(self.random.randint(0, average * 2))
+        ])
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(),
+            [Genre, Category, User, Title, Title.genre.through, Review,
+             Comment])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def write_manifest(self, titles, genres, reviews, writers):
+        manifest = {
+            'scale': {
+                key: self.options[key] for key in (
+                    'titles', 'genres', 'categories', 'users', 'writers',
+                    'reviews_per_title', 'comments_per_review', 'seed')
+            },
+            'titles': [title.pk for title in self.random.sample(
+                titles, min(len(titles), MANIFEST_SAMPLE))],
+            'genres': [genre.slug for genre in genres],
+            'reviews': [[review.title_id, review.pk]
+                        for review in self.random.sample(
+                            reviews, min(len(reviews), MANIFEST_SAMPLE))],
+            'writers': [str(AccessToken.for_user(user)) for user in writers],
+        }
+        with open(self.options['manifest'], 'w') as output:
+            json.dump(manifest, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Манифест записан в {self.options["manifest"]}')
@@ -0,0 +1,244 @@
+import csv
+import io
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, ScoreHistogram, Title)
+from reviews.signals import catalogue_rebuilt, leaderboards_rebuilt
+from users.models import User
+
+COPY_NULL = '\\N'
+
+
+def user_fields(row):
+    return {
+        'id': int(row['id']),
+        'username': row['username'],
+        'email': row['email'],
+        'role': row['role'],
+        'bio': row['bio'] or None,
+        'first_name': row['first_name'] or None,
+        'last_name': row['last_name'] or None,
+        'password': make_password(None),
+    }
+
+
+def slug_fields(row):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def title_fields(row):
+    return {
+        'id': int(row['id']),
+        'name': row['name'],
+        'year': int(row['year']),
+        'category_id': int(row['category']) if row['category'] else None,
+    }
+
+
+def genre_title_fields(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'genre_id': int(row['genre_id']),
+    }
+
+
+def review_fields(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'text': row['text'],
+        'author_id': int(row['author']),
+        'score': int(row['score']),
+        'pub_date': parse_datetime(row['pub_date']),
+    }
+
+
+def comment_fields(row):
+    return {
+        'id': int(row['id']),
+        'review_id': int(row['review_id']),
+        'text': row['text'],
+        'author_id': int(row['author']),
+        'pub_date': parse_datetime(row['pub_date']),
+    }
+
+
+# Порядок важен: родительские таблицы загружаются раньше зависимых.
+TABLES = (
+    ('users.csv', User, user_fields, {}),
+    ('category.csv', Category, slug_fields, {}),
+    ('genre.csv', Genre, slug_fields, {}),
+    ('titles.csv', Title, title_fields, {'category_id': Category}),
+    ('genre_title.csv', Title.genre.through, genre_title_fields,
+     {'title_id': Title, 'genre_id': Genre}),
+    ('review.csv', Review, review_fields,
+     {'title_id': Title, 'author_id': User}),
+    ('comments.csv', Comment, comment_fields,
+     {'review_id': Review, 'author_id': User}),
+)
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Не подменять даты из дампа текущим временем при bulk_create."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов static/data пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одном INSERT или COPY.',
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать через COPY FROM STDIN (только PostgreSQL).',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy поддерживается только PostgreSQL')
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        self.use_copy = options['copy']
+        self.known_ids = {}
+
+        with transaction.atomic():
+            for filename, model, to_fields, references in TABLES:
+                path = os.path.join(options['path'], filename)
+                if not os.path.exists(path):
+                    self.stdout.write(f'{filename}: файл не найден, пропущен')
+                    continue
+                self.import_file(path, model, to_fields, references)
+            self.reset_sequences()
+            Title.objects.rebuild_scores()
+            Title.objects.update_search_vector()
+            ScoreHistogram.objects.rebuild()
+            LeaderboardEntry.objects.rebuild()
+            leaderboards_rebuilt.send(sender=LeaderboardEntry)
+            catalogue_rebuilt.send(sender=Title)
+
+    def import_file(self, path, model, to_fields, references):
+        started = time.monotonic()
+        loaded = skipped = 0
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            rows = csv.DictReader(csv_file)
+            while True:
+                chunk = list(islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                batch = []
+                for row in chunk:
+                    fields = to_fields(row)
+                    if self.has_references(fields, references):
+                        batch.append(model(**fields))
+                    else:
+                        skipped += 1
+                self.insert(model, batch)
+                loaded += len(batch)
+                self.report(path, loaded, started, ending='\r')
+        self.known_ids.pop(model, None)
+        self.report(path, loaded, started)
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'{os.path.basename(path)}: пропущено строк с '
+                f'несуществующими ссылками: {skipped}'
+            ))
+
+    def has_references(self, fields, references):
+        for attname, parent in references.items():
+            value = fields[attname]
+            if value is not None and value not in self.get_ids(parent):
+                return False
+        return True
+
+    def get_ids(self, model):
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator())
+        return self.known_ids[model]
+
+    def insert(self, model, batch):
+        if not batch:
+            return
+        if self.use_copy:
+            self.copy(model, batch)
+        else:
+            with keep_auto_now_add(model):
+                model.objects.bulk_create(batch)
+
+    def copy(self, model, batch):
+        fields = model._meta.concrete_fields
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in batch:
+            writer.writerow([
+                COPY_NULL if value is None else value
+                for value in (
+                    field.get_db_prep_save(getattr(obj, field.attname),
+                                           connection)
+                    for field in fields
+                )
+            ])
+        buffer.seek(0)
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {table} ({columns}) FROM STDIN '
+                f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer,
+            )
+
+    def reset_sequences(self):
+        models = [model for _, model, _, _ in TABLES]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def report(self, path, loaded, started, ending='\n'):
+        if self.verbosity < 1:
+            return
+        elapsed = time.monotonic() - started
+        rate = loaded / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{os.path.basename(path)}: {loaded} строк за {elapsed:.1f} с '
+            f'({rate:.0f} строк/с)',
+            ending=ending,
+        )
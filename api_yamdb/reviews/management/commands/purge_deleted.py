@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews import deletion
+from reviews.models import PendingDeletion
+
+
+class Command(BaseCommand):
+    help = ('Удаляет помеченные произведения и пользователей: отзывы '
+            'и комментарии пачками, затем сам объект.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.DELETE_BATCH_SIZE,
+            help='Сколько строк удалять в одной транзакции.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками пустой очереди, секунд.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь до конца и завершиться.')
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            task = PendingDeletion.objects.order_by('pk').first()
+            if task is None:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            started = time.monotonic()
+            deleted = deletion.purge(task, options['batch_size'])
+            processed += 1
+            self.stdout.write(
+                f'{task}: удалено отзывов и комментариев {deleted} '
+                f'за {time.monotonic() - started:.2f} с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Итого удалено объектов: {processed}'))
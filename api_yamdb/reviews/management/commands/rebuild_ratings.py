@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.models import SCORES, LeaderboardEntry, ScoreHistogram, Title
+from reviews.signals import catalogue_rebuilt, leaderboards_rebuilt
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает хранимые рейтинги и гистограммы оценок '
+            'произведений по отзывам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не записывая.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            count = self.check_scores() + self.check_histograms()
+            if count:
+                raise CommandError(f'Расхождений найдено: {count}')
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        with transaction.atomic():
+            updated = Title.objects.rebuild_scores()
+            ScoreHistogram.objects.rebuild()
+            LeaderboardEntry.objects.rebuild()
+            leaderboards_rebuilt.send(sender=LeaderboardEntry)
+            catalogue_rebuilt.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}'))
+
+    def check_scores(self):
+        drifted = Title.objects.drifted().values_list(
+            'pk', 'score_sum', 'actual_sum', 'score_count', 'actual_count')
+        count = 0
+        for pk, score_sum, actual_sum, score_count, actual_count in (
+                drifted.iterator()):
+            count += 1
+            self.stdout.write(
+                f'Произведение {pk}: сумма {score_sum} != {actual_sum}, '
+                f'количество {score_count} != {actual_count}'
+            )
+        return count
+
+    def check_histograms(self):
+        drifted = ScoreHistogram.objects.drifted().values_list(
+            'pk', *(f'stored_{score}' for score in SCORES),
+            *(f'actual_{score}' for score in SCORES))
+        count = 0
+        for pk, *values in drifted.iterator():
+            count += 1
+            stored, actual = values[:len(SCORES)], values[len(SCORES):]
+            self.stdout.write(
+                f'Произведение {pk}: гистограмма {stored} != {actual}')
+        return count
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import LeaderboardEntry
+from reviews.signals import leaderboards_rebuilt
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинговые таблицы произведений. Лучшие '
+            'обновляются вместе с отзывами, популярные нужно пересчитывать '
+            'периодически, чтобы старые отзывы выбывали из окна.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trending',
+            action='store_true',
+            help='Пересчитать только таблицу популярных.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Повторять каждые столько секунд, не завершаясь.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            with transaction.atomic():
+                if options['trending']:
+                    LeaderboardEntry.objects.rebuild_trending()
+                else:
+                    LeaderboardEntry.objects.rebuild()
+                leaderboards_rebuilt.send(sender=LeaderboardEntry)
+            self.stdout.write(self.style.SUCCESS(
+                'Рейтинговые таблицы пересчитаны за '
+                f'{time.monotonic() - started:.2f} с'
+            ))
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_title_stats(apps, schema_editor):
+    """Агрегаты оценок и поисковый вектор для произведений, созданных до
+    появления этих полей. Гистограммы и рейтинговые таблицы строит
+    команда rebuild_ratings."""
+    alias = schema_editor.connection.alias
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.using(alias).filter(
+        title=OuterRef('pk')).order_by().values('title')
+    Title.objects.using(alias).update(
+        score_sum=Coalesce(Subquery(
+            reviews.annotate(value=Sum('score')).values('value')), 0),
+        score_count=Coalesce(Subquery(
+            reviews.annotate(value=Count('pk')).values('value')), 0),
+        rating=Subquery(
+            reviews.annotate(value=Avg('score')).values('value')),
+    )
+    if schema_editor.connection.vendor == 'postgresql':
+        config = settings.SEARCH_CONFIG
+        Title.objects.using(alias).update(search_vector=(
+            SearchVector('name', weight='A', config=config)
+            + SearchVector('description', weight='B', config=config)
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_stats_indexes_leaderboards'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,16 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, SearchVectorField)
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Avg, Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 
+from .indexes import GinIndexWithFallback
 from .validator import validate_year
 from users.models import User
 
@@ -43,6 +53,93 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    """Запросы к произведениям с учётом хранимого рейтинга."""
+
+    def alive(self):
+        """Произведения, которые не ждут фонового удаления."""
+        return self.filter(is_deleted=False)
+
+    def apply_score(self, title_id, score_delta, count_delta):
+        """Инкрементально изменить сумму и число оценок произведения."""
+        score_sum = F('score_sum') + score_delta
+        score_count = F('score_count') + count_delta
+        return self.filter(pk=title_id).update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=models.Case(
+                models.When(score_count=-count_delta, then=None),
+                default=models.ExpressionWrapper(
+                    Cast(score_sum, models.FloatField()) / score_count,
+                    output_field=models.FloatField()
+                ),
+            ),
+        )
+
+    def with_actual_scores(self):
+        """Аннотировать произведения фактическими агрегатами отзывов."""
+        return self.annotate(
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_count=Count('reviews'),
+        )
+
+    def drifted(self):
+        """Произведения, у которых хранимый рейтинг разошёлся с отзывами."""
+        return self.with_actual_scores().exclude(
+            score_sum=F('actual_sum'), score_count=F('actual_count'))
+
+    def rebuild_scores(self):
+        """Пересчитать агрегаты оценок одним UPDATE по подзапросам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        return self.update(
+            score_sum=Coalesce(Subquery(
+                reviews.annotate(value=Sum('score')).values('value')), 0),
+            score_count=Coalesce(Subquery(
+                reviews.annotate(value=Count('pk')).values('value')), 0),
+            rating=Subquery(
+                reviews.annotate(value=Avg('score')).values('value')),
+        )
+
+    def update_search_vector(self):
+        """Обновить поисковый вектор (только PostgreSQL)."""
+        if connections[self.db].vendor != 'postgresql':
+            return 0
+        config = settings.SEARCH_CONFIG
+        return self.update(search_vector=(
+            SearchVector('name', weight='A', config=config)
+            + SearchVector('description', weight='B', config=config)
+        ))
+
+    def search(self, text):
+        """Полнотекстовый поиск по названию и описанию с сортировкой по
+        релевантности; на других СУБД — поиск подстроки."""
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(
+                models.Q(name__icontains=text)
+                | models.Q(description__icontains=text))
+        query = SearchQuery(
+            text, config=settings.SEARCH_CONFIG, search_type='websearch')
+        return self.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', 'name')
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def alive(self):
+        """Отзывы на произведения, которые не ждут фонового удаления."""
+        return self.filter(title__is_deleted=False)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def alive(self):
+        """Комментарии к отзывам на произведения, которые не ждут
+        фонового удаления."""
+        return self.filter(review__title__is_deleted=False)
+
+
 class Title(models.Model):
     name = models.CharField(
         max_length=200,
@@ -72,8 +169,42 @@ class Title(models.Model):
         verbose_name='Категория произведения',
         related_name='titles',
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    score_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг произведения',
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор',
+    )
+    is_deleted = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Удаляется',
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
+        indexes = [
+            GinIndexWithFallback(
+                fields=('search_vector',),
+                name='title_search_vector_idx'
+            ),
+        ]
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
@@ -112,6 +243,21 @@ class Review(models.Model):
         verbose_name='Оценка произведения'
     )
 
+    objects = ReviewQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = (
+            instance.__dict__.get('title_id'), instance.__dict__.get('score'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется в post_save, поэтому отзыв
+        # и агрегаты должны сохраняться в одной транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -119,6 +265,12 @@ class Review(models.Model):
                 name='unique_title_author'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
         ordering = ('pub_date',)
         verbose_name = 'Отзыв'
 
@@ -149,9 +301,333 @@ class Comment(models.Model):
         verbose_name='Дата добавления'
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
         ordering = ('pub_date',)
         verbose_name = 'Комментарий'
 
     def __str__(self):
         return self.text
+
+
+TOP_BOARD = 'top'
+TRENDING_BOARD = 'trending'
+# Ключ pg_advisory_xact_lock, которым пересчёты таблиц ждут друг друга:
+# один — на все таблицы, в паре с id — на произведение.
+LEADERBOARD_LOCK = 4172
+
+
+def category_board(category_id):
+    return f'category:{category_id}'
+
+
+def genre_board(genre_id):
+    return f'genre:{genre_id}'
+
+
+class LeaderboardQuerySet(models.QuerySet):
+    """Заранее посчитанные рейтинговые таблицы произведений."""
+
+    def board(self, name):
+        """Записи таблицы name от лучших к худшим."""
+        return self.filter(board=name).order_by('-score', 'title_id')
+
+    def lock(self, title_ids=None):
+        """Дождаться чужих пересчётов до конца текущей транзакции.
+
+        Пересчёт удаляет строки и вставляет их заново: без блокировки
+        соседний пересчёт тех же произведений вставляет свои строки между
+        этими шагами, и вставка падает на unique_board_title. Пересчёт
+        title_ids блокирует только эти произведения (по возрастанию id,
+        чтобы не было взаимоблокировок) и разделяемо — общий ключ; полный
+        пересчёт (title_ids=None) берёт общий ключ монопольно. SQLite и так
+        выполняет записи по очереди.
+        """
+        connection = connections[router.db_for_write(self.model)]
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            if title_ids is None:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)',
+                               [LEADERBOARD_LOCK])
+                return
+            cursor.execute('SELECT pg_advisory_xact_lock_shared(%s)',
+                           [LEADERBOARD_LOCK])
+            for title_id in sorted(title_ids):
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)',
+                               [LEADERBOARD_LOCK, title_id])
+
+    def refresh(self, title_ids):
+        """Пересчитать все таблицы, в которых участвуют title_ids."""
+        title_ids = set(title_ids)
+        if not title_ids:
+            return
+        with transaction.atomic():
+            self.lock(title_ids)
+            self._refresh(title_ids)
+
+    def _refresh(self, title_ids):
+        boards = defaultdict(set)
+        ratings = {}
+        titles = Title.objects.alive().filter(
+            pk__in=title_ids, rating__isnull=False
+        ).order_by().values_list('pk', 'rating', 'category', 'genre')
+        for title_id, rating, category_id, genre_id in titles:
+            ratings[title_id] = rating
+            boards[title_id].add(TOP_BOARD)
+            if category_id is not None:
+                boards[title_id].add(category_board(category_id))
+            if genre_id is not None:
+                boards[title_id].add(genre_board(genre_id))
+        entries = [
+            self.model(board=board, title_id=title_id,
+                       score=ratings[title_id])
+            for title_id, title_boards in boards.items()
+            for board in title_boards
+        ]
+        entries.extend(
+            self.model(board=TRENDING_BOARD, title_id=title_id, score=count)
+            for title_id, count in self.trending_counts(title_ids)
+        )
+        self.filter(title_id__in=title_ids).delete()
+        self.bulk_create(entries)
+
+    def rebuild(self, batch_size=1000):
+        """Пересчитать все таблицы с нуля."""
+        with transaction.atomic():
+            self.lock()
+            self._rebuild(batch_size)
+
+    def _rebuild(self, batch_size):
+        self.all().delete()
+        # Отзывы есть только у произведений с рейтингом, поэтому их
+        # достаточно и для таблицы популярных.
+        title_ids = list(Title.objects.filter(
+            rating__isnull=False).values_list('pk', flat=True))
+        for start in range(0, len(title_ids), batch_size):
+            self._refresh(set(title_ids[start:start + batch_size]))
+
+    def rebuild_trending(self):
+        """Пересчитать таблицу популярных: отзывы старше окна выбывают."""
+        with transaction.atomic():
+            self.lock()
+            self.filter(board=TRENDING_BOARD).delete()
+            self.bulk_create(
+                (self.model(board=TRENDING_BOARD, title_id=title_id,
+                            score=count)
+                 for title_id, count in self.trending_counts()),
+                batch_size=1000,
+            )
+
+    @staticmethod
+    def trending_counts(title_ids=None):
+        """Число отзывов за последние TRENDING_DAYS дней по произведениям."""
+        since = timezone.now() - timedelta(days=settings.TRENDING_DAYS)
+        reviews = Review.objects.alive().filter(pub_date__gte=since)
+        if title_ids is not None:
+            reviews = reviews.filter(title_id__in=title_ids)
+        return reviews.order_by().values('title').annotate(
+            count=Count('pk')).values_list('title', 'count').iterator()
+
+
+class LeaderboardEntry(models.Model):
+    """Место произведения в рейтинговой таблице: лучшие в целом, в жанре,
+    в категории или популярные за последние дни."""
+    board = models.CharField(
+        max_length=50,
+        verbose_name='Таблица',
+    )
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField(verbose_name='Значение')
+
+    objects = LeaderboardQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'title'],
+                name='unique_board_title'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('board', '-score', 'title'),
+                name='leaderboard_board_score_idx'
+            ),
+        ]
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинговые таблицы'
+
+    def __str__(self):
+        return f'{self.board}: {self.title_id}'
+
+
+SCORES = range(1, 11)
+
+
+def score_field(score):
+    return f'score_{score}'
+
+
+class ScoreHistogramQuerySet(models.QuerySet):
+    """Гистограммы оценок: по счётчику на каждую оценку от 1 до 10."""
+
+    def apply(self, title_id, score, delta):
+        """Изменить на delta счётчик оценки score произведения.
+
+        Гистограммы нет, если произведение создано без сигналов (bulk_create)
+        или уже удаляется каскадом; в первом случае она строится по отзывам.
+        """
+        field = score_field(score)
+        updated = self.filter(title_id=title_id).update(
+            **{field: F(field) + delta})
+        if not updated and delta > 0:
+            self.refresh([title_id])
+
+    def refresh(self, title_ids):
+        """Пересчитать гистограммы title_ids по отзывам."""
+        title_ids = set(title_ids)
+        if not title_ids:
+            return
+        fields = [score_field(score) for score in SCORES]
+        counts = {
+            row[0]: row[1:]
+            for row in Review.objects.filter(
+                title_id__in=title_ids
+            ).order_by().values('title').annotate(**{
+                score_field(score): Count('pk', filter=models.Q(score=score))
+                for score in SCORES
+            }).values_list('title', *fields)
+        }
+        self.filter(title_id__in=title_ids).delete()
+        # Гистограмму мог одновременно создать соседний запрос: его
+        # строка остаётся, расхождение найдёт rebuild_ratings --check.
+        self.bulk_create([
+            self.model(title_id=title_id, **dict(zip(
+                fields, counts.get(title_id, (0,) * len(fields)))))
+            for title_id in title_ids
+        ], ignore_conflicts=True)
+
+    def rebuild(self, batch_size=1000):
+        """Пересчитать гистограммы всех произведений с нуля."""
+        self.all().delete()
+        title_ids = list(Title.objects.values_list('pk', flat=True))
+        for start in range(0, len(title_ids), batch_size):
+            self.refresh(title_ids[start:start + batch_size])
+
+    @staticmethod
+    def drifted():
+        """Произведения, у которых гистограмма разошлась с отзывами."""
+        stored = {
+            f'stored_{score}': Coalesce(
+                f'score_histogram__{score_field(score)}', 0,
+                output_field=models.IntegerField())
+            for score in SCORES
+        }
+        actual = {
+            f'actual_{score}': Count(
+                'reviews', filter=models.Q(reviews__score=score))
+            for score in SCORES
+        }
+        return Title.objects.annotate(**stored, **actual).exclude(**{
+            f'stored_{score}': F(f'actual_{score}') for score in SCORES
+        })
+
+
+class ScoreHistogram(models.Model):
+    """Число оценок каждого значения у произведения: из него считается
+    статистика отзывов без чтения самих отзывов."""
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_histogram',
+        verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    objects = ScoreHistogramQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Гистограмма оценок'
+        verbose_name_plural = 'Гистограммы оценок'
+
+    def __str__(self):
+        return str(self.title_id)
+
+    @property
+    def counts(self):
+        return {score: getattr(self, score_field(score)) for score in SCORES}
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def mean(self):
+        total = self.total
+        if not total:
+            return None
+        return sum(
+            score * count for score, count in self.counts.items()) / total
+
+    @property
+    def median(self):
+        """Медиана оценок; при чётном числе — среднее двух средних."""
+        total = self.total
+        if not total:
+            return None
+        middle = [(total - 1) // 2, total // 2]
+        values, seen = [], 0
+        for score, count in self.counts.items():
+            seen += count
+            while middle and middle[0] < seen:
+                values.append(score)
+                middle.pop(0)
+        return sum(values) / 2
+
+
+class PendingDeletion(models.Model):
+    """Очередь удаления произведений и пользователей с большим числом
+    отзывов и комментариев, обрабатываемая командой purge_deleted."""
+    TITLE = 'title'
+    USER = 'user'
+    KINDS = ((TITLE, 'Произведение'),
+             (USER, 'Пользователь'))
+
+    kind = models.CharField('Что удаляется', max_length=10, choices=KINDS)
+    object_id = models.PositiveIntegerField('Id объекта')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'],
+                name='unique_pending_deletion'
+            ),
+        ]
+        ordering = ('pk',)
+        verbose_name = 'Отложенное удаление'
+        verbose_name_plural = 'Отложенные удаления'
+
+    def __str__(self):
+        return f'{self.kind}: {self.object_id}'
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки для больших таблиц.
+
+    Точный COUNT(*) по миллионам строк читает всю таблицу. Для списка без
+    фильтров на PostgreSQL число строк берётся из статистики pg_class,
+    если оно не меньше ADMIN_ESTIMATED_COUNT_FROM; иначе считается точно.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is not None and estimate >= (
+                settings.ADMIN_ESTIMATED_COUNT_FROM):
+            return estimate
+        return super().count
+
+    def estimate(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.has_filters():
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [connection.ops.quote_name(query.model._meta.db_table)]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
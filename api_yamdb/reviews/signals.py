@@ -0,0 +1,104 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import (Category, Genre, LeaderboardEntry, Review,
+                     ScoreHistogram, Title, category_board, genre_board)
+
+# Рейтинговые таблицы пересчитаны целиком, без сигналов моделей.
+leaderboards_rebuilt = Signal()
+# Данные каталога загружены или пересчитаны командой (import_csv,
+# generate_data, rebuild_ratings) без сигналов моделей.
+catalogue_rebuilt = Signal()
+# Отзывы или комментарии удалены пачкой без сигналов моделей
+# (reviews.deletion); аргументы title_ids и review_ids.
+reviews_purged = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Учесть оценку нового или изменённого отзыва в рейтинге."""
+    if raw:
+        return
+    loaded_title_id, loaded_score = getattr(
+        instance, '_loaded_score', (None, None))
+    if not created and (loaded_title_id, loaded_score) == (
+            instance.title_id, instance.score):
+        return
+    if created:
+        Title.objects.apply_score(instance.title_id, instance.score, 1)
+        ScoreHistogram.objects.apply(instance.title_id, instance.score, 1)
+    elif loaded_title_id is None:
+        Title.objects.filter(pk=instance.title_id).rebuild_scores()
+        ScoreHistogram.objects.refresh([instance.title_id])
+    elif loaded_title_id != instance.title_id:
+        Title.objects.apply_score(loaded_title_id, -loaded_score, -1)
+        Title.objects.apply_score(instance.title_id, instance.score, 1)
+        ScoreHistogram.objects.apply(loaded_title_id, loaded_score, -1)
+        ScoreHistogram.objects.apply(instance.title_id, instance.score, 1)
+    elif loaded_score != instance.score:
+        Title.objects.apply_score(
+            instance.title_id, instance.score - loaded_score, 0)
+        ScoreHistogram.objects.apply(instance.title_id, loaded_score, -1)
+        ScoreHistogram.objects.apply(instance.title_id, instance.score, 1)
+    instance._loaded_score = (instance.title_id, instance.score)
+    LeaderboardEntry.objects.refresh(
+        {instance.title_id, loaded_title_id} - {None})
+
+
+@receiver(post_save, sender=Title)
+def update_title_search_vector(sender, instance, raw, update_fields,
+                               **kwargs):
+    """Пересчитать поисковый вектор после изменения названия/описания."""
+    if raw or (update_fields
+               and not {'name', 'description'} & set(update_fields)):
+        return
+    Title.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    """Исключить оценку удалённого отзыва из рейтинга."""
+    Title.objects.apply_score(instance.title_id, -instance.score, -1)
+    ScoreHistogram.objects.apply(instance.title_id, instance.score, -1)
+    LeaderboardEntry.objects.refresh([instance.title_id])
+
+
+@receiver(post_save, sender=Title)
+def create_score_histogram(sender, instance, created, raw, **kwargs):
+    """Пустая гистограмма сразу, чтобы первые отзывы только меняли
+    счётчики."""
+    if created and not raw:
+        ScoreHistogram.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Title)
+def update_title_leaderboards(sender, instance, created, raw, **kwargs):
+    """Категория произведения могла смениться."""
+    if raw or created:
+        return
+    LeaderboardEntry.objects.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_leaderboards(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        LeaderboardEntry.objects.refresh([instance.pk])
+    elif pk_set is None:
+        LeaderboardEntry.objects.filter(
+            board=genre_board(instance.pk)).delete()
+    else:
+        LeaderboardEntry.objects.refresh(pk_set)
+
+
+@receiver(post_delete, sender=Category)
+def delete_category_leaderboard(sender, instance, **kwargs):
+    LeaderboardEntry.objects.filter(
+        board=category_board(instance.pk)).delete()
+
+
+@receiver(post_delete, sender=Genre)
+def delete_genre_leaderboard(sender, instance, **kwargs):
+    LeaderboardEntry.objects.filter(board=genre_board(instance.pk)).delete()
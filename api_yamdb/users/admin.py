@@ -1,5 +1,22 @@
 from django.contrib import admin
 
-from .models import User
+from reviews.admin import LargeTableAdmin
 
-admin.site.register(User)
+from .models import OutgoingEmail, User
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'recipient', 'subject', 'status', 'attempts', 'next_attempt')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+
+
+class UserAdmin(LargeTableAdmin):
+    list_display = ('username', 'email', 'role', 'is_active')
+    list_filter = ('role', 'is_active')
+    search_fields = ('username', 'email')
+
+
+admin.site.register(User, UserAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,114 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пакетами через одно '
+            'SMTP-соединение с повторами и экспоненциальной задержкой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMAIL_BATCH_SIZE,
+            help='Сколько писем отправлять за один проход.')
+        parser.add_argument(
+            '--max-attempts', type=int, default=settings.EMAIL_MAX_ATTEMPTS,
+            help='После стольких неудач письмо помечается неотправленным.')
+        parser.add_argument(
+            '--retry-delay', type=int, default=settings.EMAIL_RETRY_DELAY,
+            help='Задержка перед первой повторной попыткой, секунд.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками пустой очереди, секунд.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь до конца и завершиться.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            started = time.monotonic()
+            stats = self.send_batch()
+            for key, value in stats.items():
+                totals[key] += value
+            processed = sum(stats.values())
+            if processed:
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    'отправлено {sent}, повтор {retried}, '
+                    'ошибок {failed}'.format(**stats)
+                    + f' за {elapsed:.2f} с'
+                )
+            if processed < options['batch_size']:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            'Итого: отправлено {sent}, повтор {retried}, '
+            'ошибок {failed}'.format(**totals)
+        ))
+
+    def send_batch(self):
+        stats = {'sent': 0, 'retried': 0, 'failed': 0}
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutgoingEmail.PENDING,
+                        next_attempt__lte=timezone.now())
+                .order_by('next_attempt')[:self.options['batch_size']]
+            )
+            if not emails:
+                return stats
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as error:
+                for email in emails:
+                    stats[self.postpone(email, error)] += 1
+                return stats
+            try:
+                for email in emails:
+                    stats[self.send(connection, email)] += 1
+            finally:
+                connection.close()
+        return stats
+
+    def send(self, connection, email):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email.recipient],
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as error:
+            return self.postpone(email, error)
+        email.status = OutgoingEmail.SENT
+        email.attempts += 1
+        email.sent = timezone.now()
+        email.save(update_fields=('status', 'attempts', 'sent'))
+        return 'sent'
+
+    def postpone(self, email, error):
+        email.attempts += 1
+        email.last_error = f'{type(error).__name__}: {error}'
+        if email.attempts >= self.options['max_attempts']:
+            email.status = OutgoingEmail.FAILED
+            result = 'failed'
+        else:
+            delay = self.options['retry_delay'] * 2 ** (email.attempts - 1)
+            email.next_attempt = timezone.now() + timedelta(seconds=delay)
+            result = 'retried'
+        email.save(update_fields=(
+            'status', 'attempts', 'last_error', 'next_attempt'))
+        return result
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 USER = 'user'
 ADMIN = 'admin'
@@ -31,6 +32,12 @@ class User(AbstractUser):
     role = models.CharField(
         'Роль пользователя', max_length=15, choices=ROLES, default=USER)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
     @property
     def is_user(self):
         return self.role == USER
@@ -47,3 +54,39 @@ class User(AbstractUser):
         ordering = ('pk',)
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+
+
+class OutgoingEmail(models.Model):
+    """Очередь исходящих писем, отправляемых командой send_emails"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = ((PENDING, 'Ожидает отправки'),
+                (SENT, 'Отправлено'),
+                (FAILED, 'Не отправлено'))
+
+    recipient = models.EmailField('Получатель', max_length=254)
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('status', 'next_attempt'),
+                name='outgoing_email_due_idx'
+            ),
+        ]
+        ordering = ('pk',)
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,284 @@
+"""Сценарии нагрузки на всё API по данным из generate_data.
+
+Сначала заполнить базу и записать манифест с id и токенами:
+
+    python api_yamdb/manage.py generate_data --titles 5000 \\
+        --reviews-per-title 20 --manifest bench.json
+
+Затем запустить сервер (runserver, gunicorn или docker compose) с
+поднятыми лимитами регистрации, иначе сценарий signup упрётся в 429:
+
+    THROTTLE_SIGNUP_IP=100000/m THROTTLE_TOKEN_IP=100000/m ...
+
+и прогнать сценарии, сохранив базовую линию текущего коммита:
+
+    python benchmarks/scenarios.py http://localhost:8000 \\
+        --manifest bench.json --concurrency 20 --duration 15 \\
+        --save baselines/
+
+Сравнить с другой базовой линией; код возврата 1, если какой-то
+сценарий стал медленнее порога (по умолчанию 10% по rps или p95):
+
+    python benchmarks/scenarios.py --compare baselines/a1b2c3d.json \\
+        baselines/e4f5a6b.json --threshold 10
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import requests
+
+from loadtest import summarize
+
+API = '/api/v1'
+
+
+class Scenario:
+    """Один вид запроса; request возвращает (метод, путь, параметры)."""
+    name = None
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+
+    def request(self, rng):
+        raise NotImplementedError
+
+
+class BrowseTitles(Scenario):
+    name = 'browse_titles'
+
+    def request(self, rng):
+        pages = max(1, len(self.manifest['titles']) // 10)
+        return 'get', f'{API}/titles/', {
+            'params': {'page': rng.randint(1, min(pages, 50))}}
+
+
+class FilterByGenre(Scenario):
+    name = 'filter_by_genre'
+
+    def request(self, rng):
+        return 'get', f'{API}/titles/', {
+            'params': {'genre': rng.choice(self.manifest['genres'])}}
+
+
+class ReadReviews(Scenario):
+    name = 'read_reviews'
+
+    def request(self, rng):
+        title_id, review_id = rng.choice(self.manifest['reviews'])
+        if rng.random() < 0.5:
+            return 'get', f'{API}/titles/{title_id}/reviews/', {}
+        return 'get', (f'{API}/titles/{title_id}/reviews/{review_id}/'
+                       'comments/'), {}
+
+
+class PostReview(Scenario):
+    """Каждый отзыв — новая пара (пользователь, произведение): у
+    пользователей-писателей из generate_data отзывов ещё нет."""
+    name = 'post_review'
+
+    def __init__(self, manifest):
+        super().__init__(manifest)
+        pairs = list(itertools.product(manifest['writers'],
+                                       manifest['titles']))
+        random.Random(0).shuffle(pairs)
+        self.pairs = iter(pairs)
+        self.lock = threading.Lock()
+
+    def request(self, rng):
+        with self.lock:
+            token, title_id = next(self.pairs)
+        return 'post', f'{API}/titles/{title_id}/reviews/', {
+            'json': {'text': 'Отзыв из нагрузочного теста',
+                     'score': rng.randint(1, 10)},
+            'headers': {'Authorization': f'Bearer {token}'},
+        }
+
+
+class SignUp(Scenario):
+    name = 'signup'
+
+    def __init__(self, manifest):
+        super().__init__(manifest)
+        self.run_id = f'{int(time.time()):x}'
+        self.counter = itertools.count()
+
+    def request(self, rng):
+        username = f'bench_signup_{self.run_id}_{next(self.counter)}'
+        return 'post', f'{API}/auth/signup/', {
+            'json': {'username': username,
+                     'email': f'{username}@yamdb.fake'}}
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    BrowseTitles, FilterByGenre, ReadReviews, PostReview, SignUp)}
+
+
+def worker(base_url, scenario, deadline, seed, results, lock):
+    session = requests.Session()
+    rng = random.Random(seed)
+    latencies, statuses = [], Counter()
+    while time.monotonic() < deadline:
+        try:
+            method, path, kwargs = scenario.request(rng)
+        except StopIteration:
+            break
+        started = time.perf_counter()
+        try:
+            status = session.request(method, base_url + path, timeout=30,
+                                     **kwargs).status_code
+        except requests.RequestException:
+            status = 'error'
+        elapsed = time.perf_counter() - started
+        statuses[status] += 1
+        if status != 'error' and status < 400:
+            latencies.append(elapsed)
+    with lock:
+        results['latencies'].extend(latencies)
+        results['statuses'].update(statuses)
+
+
+def run_scenario(base_url, scenario, concurrency, duration):
+    results = {'latencies': [], 'statuses': Counter()}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(
+            base_url.rstrip('/'), scenario, deadline, seed, results, lock))
+        for seed in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    statuses = results['statuses']
+    stats = summarize(results['latencies'],
+                      sum(statuses.values()) - len(results['latencies']),
+                      elapsed)
+    stats['statuses'] = {str(code): count
+                         for code, count in sorted(statuses.items(),
+                                                   key=str)}
+    return stats
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f'{"сценарий":16} {"rps":>9} {"p50":>9} {"p95":>9} {"p99":>9} '
+          f'{"ошибок":>7}  коды ответов')
+    for name, stats in results.items():
+        codes = ', '.join(f'{code}: {count}'
+                          for code, count in stats['statuses'].items())
+        print(f'{name:16} {stats["rps"]:9.1f} {stats["p50_ms"]:9.2f} '
+              f'{stats["p95_ms"]:9.2f} {stats["p99_ms"]:9.2f} '
+              f'{stats["errors"]:7}  {codes}')
+
+
+def compare(before, after, threshold):
+    """Печатает изменения по сценариям; возвращает список регрессий."""
+    print(f'{before["meta"].get("commit")} → {after["meta"].get("commit")}')
+    for key in ('concurrency', 'duration', 'scale'):
+        if before['meta'].get(key) != after['meta'].get(key):
+            print(f'Внимание: прогоны различаются по {key}, сравнение '
+                  'может быть некорректным.')
+    print(f'{"сценарий":16} {"rps":>24} {"p95, мс":>26}')
+    regressions = []
+    for name, new in after['results'].items():
+        old = before['results'].get(name)
+        if old is None:
+            continue
+        rps_change = (new['rps'] / old['rps'] - 1) * 100 if old['rps'] else 0
+        p95_change = ((new['p95_ms'] / old['p95_ms'] - 1) * 100
+                      if old['p95_ms'] else 0)
+        regressed = rps_change < -threshold or p95_change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f'{name:16} {old["rps"]:8.1f} → {new["rps"]:8.1f} '
+              f'({rps_change:+4.0f}%) {old["p95_ms"]:8.2f} → '
+              f'{new["p95_ms"]:8.2f} ({p95_change:+4.0f}%)'
+              f'{"  РЕГРЕССИЯ" if regressed else ""}')
+    return regressions
+
+
+def save(path, report):
+    if path.endswith(os.sep) or os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        path = os.path.join(
+            path, f'{report["meta"]["commit"] or "baseline"}.json')
+    with open(path, 'w') as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    print(f'Результаты сохранены в {path}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base_url', nargs='?')
+    parser.add_argument('--manifest', default='bench.json',
+                        help='Манифест из manage.py generate_data.')
+    parser.add_argument('--scenario', action='append', dest='scenarios',
+                        choices=SCENARIOS,
+                        help='Какие сценарии запускать; по умолчанию все.')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Секунд на каждый сценарий.')
+    parser.add_argument('--save',
+                        help='Файл или каталог (тогда имя — хеш коммита).')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--threshold', type=float, default=10,
+                        help='Допустимое ухудшение rps или p95, %%.')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            regressions = compare(json.load(before), json.load(after),
+                                  args.threshold)
+        if regressions:
+            print(f'Регрессии больше {args.threshold:g}%: '
+                  f'{", ".join(regressions)}')
+            sys.exit(1)
+        return
+    if not args.base_url:
+        parser.error('нужен адрес сервера или --compare')
+
+    with open(args.manifest) as source:
+        manifest = json.load(source)
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        results[name] = run_scenario(
+            args.base_url, SCENARIOS[name](manifest), args.concurrency,
+            args.duration)
+    print_results(results)
+    if args.save:
+        save(args.save, {
+            'meta': {
+                'commit': git_commit(),
+                'created': datetime.now(timezone.utc).isoformat(),
+                'base_url': args.base_url,
+                'concurrency': args.concurrency,
+                'duration': args.duration,
+                'scale': manifest.get('scale'),
+            },
+            'results': results,
+        })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Микробенчмарк сериализации списков: ModelSerializer + JSONRenderer
+против сериализаторов по .values() + ORJSONRenderer (FAST_JSON).
+
+Запускается на заполненной базе (например, после import_csv):
+
+    DJANGO_SETTINGS_MODULE=api_yamdb.settings \\
+        python benchmarks/serialization.py --rows 1000 --repeat 20
+
+Для каждого вида данных печатает пропускную способность в строках
+в секунду: только сериализация и рендеринг уже загруженных данных
+(для произведений сюда входит запрос жанров по .values()) и полный
+путь вместе с запросами к БД. Заодно проверяет, что оба пути дают
+одинаковые байты.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                    'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.renderers import ORJSONRenderer  # noqa: E402
+from api.row_serializers import (CommentRowSerializer,  # noqa: E402
+                                 ReviewRowSerializer, TitleRowSerializer)
+from api.serializers import (CommentSerializer,  # noqa: E402
+                             ReviewSerializer, TitleReadSerializer)
+from reviews.models import Comment, Review, Title  # noqa: E402
+
+CASES = (
+    ('titles', lambda: Title.objects.select_related(
+        'category').prefetch_related('genre'),
+     TitleReadSerializer, TitleRowSerializer),
+    ('reviews', lambda: Review.objects.select_related('author', 'title'),
+     ReviewSerializer, ReviewRowSerializer),
+    ('comments', lambda: Comment.objects.select_related('author'),
+     CommentSerializer, CommentRowSerializer),
+)
+
+
+def best_rate(func, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best if best else 0.0
+
+
+def run(limit, repeat):
+    print(f'{"":10} {"строк":>6} {"DRF, строк/с":>14} {"FAST, строк/с":>14} '
+          f'{"ускорение":>10}')
+    for name, get_queryset, serializer_class, row_serializer_class in CASES:
+        row_serializer = row_serializer_class()
+
+        def drf_full():
+            objects = list(get_queryset().order_by('pk')[:limit])
+            return JSONRenderer().render(
+                serializer_class(objects, many=True).data)
+
+        def fast_full():
+            rows = list(row_serializer.get_rows(
+                get_queryset().order_by('pk'))[:limit])
+            return ORJSONRenderer().render(row_serializer.data(rows))
+
+        objects = list(get_queryset().order_by('pk')[:limit])
+        rows = list(row_serializer.get_rows(
+            get_queryset().order_by('pk'))[:limit])
+        if not objects:
+            print(f'{name:10} нет данных')
+            continue
+        if drf_full() != fast_full():
+            print(f'{name:10} ответы различаются!')
+            continue
+
+        for label, drf, fast in (
+            ('только CPU',
+             lambda: JSONRenderer().render(
+                 serializer_class(objects, many=True).data),
+             lambda: ORJSONRenderer().render(row_serializer.data(rows))),
+            ('с БД', drf_full, fast_full),
+        ):
+            drf_rate = best_rate(drf, len(objects), repeat)
+            fast_rate = best_rate(fast, len(objects), repeat)
+            print(f'{name:10} {len(objects):6} {drf_rate:14.0f} '
+                  f'{fast_rate:14.0f} {fast_rate / drf_rate:9.1f}x'
+                  f'  {label}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='Сколько строк сериализовать за раз.')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Сколько повторов; берётся лучший.')
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
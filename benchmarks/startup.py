@@ -0,0 +1,174 @@
+"""Время запуска приложения: импорт модулей и первый ответ gunicorn.
+
+Запускается из корня репозитория с переменными окружения приложения
+(база должна быть доступна, ALLOWED_HOSTS должен разрешать localhost):
+
+    python benchmarks/startup.py --save startup.json
+
+1. Импорт: python -X importtime загружает api_yamdb.wsgi (то есть
+   django.setup() и все приложения), собственное время модулей
+   суммируется по пакетам верхнего уровня.
+2. Первый ответ: gunicorn с gunicorn.conf.py запускается с предзагрузкой
+   и без, замеряется время от старта процесса до первого ответа на
+   --path и задержка первого и второго запроса.
+
+Сравнение с сохранённым прогоном; код возврата 1, если что-то
+замедлилось больше порога:
+
+    python benchmarks/startup.py --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import requests
+
+APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'api_yamdb')
+IMPORT_LINE = re.compile(
+    r'import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)')
+
+
+def measure_imports(repeat):
+    """Лучшее из repeat собственное время импорта по пакетам, мс."""
+    best = {}
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             'import api_yamdb.wsgi'],
+            cwd=APP_DIR, capture_output=True, text=True, check=True)
+        packages = defaultdict(float)
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                package = match.group(4).split('.')[0]
+                packages[package] += int(match.group(1)) / 1000
+        packages['total'] = sum(packages.values())
+        for package, value in packages.items():
+            best[package] = min(best.get(package, value), value)
+    return {package: round(value, 1) for package, value in best.items()}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(path, preload, workers, timeout=60):
+    port = free_port()
+    env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_PRELOAD=str(preload), GUNICORN_WORKERS=str(workers))
+    url = f'http://localhost:{port}{path}'
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f'{url} не ответил за {timeout} с')
+            if server.poll() is not None:
+                raise RuntimeError('gunicorn завершился при запуске')
+            try:
+                request_started = time.perf_counter()
+                response = requests.get(url, timeout=timeout)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.01)
+        ready = time.perf_counter()
+        second_started = time.perf_counter()
+        requests.get(url, timeout=timeout)
+        second = time.perf_counter() - second_started
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        'status': response.status_code,
+        'first_response_ms': round((ready - started) * 1000, 1),
+        'first_request_ms': round((ready - request_started) * 1000, 1),
+        'second_request_ms': round(second * 1000, 1),
+    }
+
+
+def print_results(results, top):
+    print(f'{"импорт, мс":24} {"":>9}')
+    imports = results['imports']
+    ranked = sorted(imports.items(), key=lambda item: -item[1])
+    for package, value in ranked[:top + 1]:
+        print(f'{package:24} {value:9.1f}')
+    print()
+    print(f'{"gunicorn":24} {"до ответа":>10} {"1-й запрос":>11} '
+          f'{"2-й запрос":>11} {"код":>5}')
+    for mode, stats in results['servers'].items():
+        print(f'{mode:24} {stats["first_response_ms"]:10.1f} '
+              f'{stats["first_request_ms"]:11.1f} '
+              f'{stats["second_request_ms"]:11.1f} {stats["status"]:5}')
+
+
+def compare(before, after, threshold):
+    """Печатает изменения; возвращает список замедлившихся метрик."""
+    pairs = [(f'импорт {package}', before['imports'].get(package), value)
+             for package, value in after['imports'].items()]
+    for mode, stats in after['servers'].items():
+        old = before['servers'].get(mode, {})
+        for key in ('first_response_ms', 'first_request_ms'):
+            pairs.append((f'{mode} {key}', old.get(key), stats[key]))
+    regressions = []
+    for name, old, new in pairs:
+        if not old:
+            continue
+        change = (new / old - 1) * 100
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f'{name:40} {old:9.1f} → {new:9.1f} ({change:+4.0f}%)'
+              f'{"  РЕГРЕССИЯ" if regressed else ""}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default='/api/v1/titles/')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Сколько раз мерить импорт; берётся лучший.')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Сколько самых медленных пакетов показать.')
+    parser.add_argument('--save', help='Сохранить результаты в JSON.')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--threshold', type=float, default=20,
+                        help='Допустимое замедление, %%.')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            regressions = compare(json.load(before), json.load(after),
+                                  args.threshold)
+        if regressions:
+            sys.exit(1)
+        return
+
+    results = {
+        'imports': measure_imports(args.repeat),
+        'servers': {
+            f'preload={preload}': measure_first_response(
+                args.path, preload, args.workers)
+            for preload in (True, False)
+        },
+    }
+    print_results(results, args.top)
+    if args.save:
+        with open(args.save, 'w') as output:
+            json.dump(results, output, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from reviews.paginator import EstimatedCountPaginator
+from users.models import User
+
+CHANGELISTS = (
+    '/admin/reviews/title/',
+    '/admin/reviews/review/',
+    '/admin/reviews/comment/',
+    '/admin/reviews/genre/',
+    '/admin/reviews/category/',
+    '/admin/users/user/',
+)
+
+
+def add_rows(title, review, start, count):
+    """count произведений, пользователей, их отзывов на title
+    и комментариев к review."""
+    Title.objects.bulk_create(
+        Title(name=f'Админка {i}', year=2000, category=title.category)
+        for i in range(start, start + count)
+    )
+    User.objects.bulk_create(
+        User(username=f'staff{i}', email=f'staff{i}@yamdb.fake')
+        for i in range(start, start + count)
+    )
+    authors = User.objects.filter(username__in=[
+        f'staff{i}' for i in range(start, start + count)])
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв', score=5)
+        for author in authors
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий')
+        for author in authors
+    )
+
+
+@pytest.fixture
+def site_client(django_user_model):
+    superuser = django_user_model.objects.create_superuser(
+        username='SiteAdmin', email='site@yamdb.fake', password='secret')
+    client = Client()
+    client.force_login(superuser)
+    return client
+
+
+def count_queries(client, url):
+    # Первый запрос заполняет кеши типов содержимого и сессии.
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    return response, queries
+
+
+@pytest.mark.django_db
+class TestAdminQueryCount:
+
+    @pytest.mark.parametrize('url', CHANGELISTS)
+    def test_changelist_query_count(self, site_client, review, url):
+        add_rows(review.title, review, 0, 3)
+        _, before = count_queries(site_client, url)
+        add_rows(review.title, review, 3, 30)
+        _, after = count_queries(site_client, url)
+        assert len(after) == len(before), (
+            f'Проверьте, что число запросов списка {url} не растёт с числом '
+            f'строк: было {len(before)}, стало {len(after)}:\n'
+            + '\n'.join(query['sql'] for query in after)
+        )
+
+    @pytest.mark.parametrize('model', ('title', 'review', 'comment'))
+    def test_change_form_query_count(self, site_client, review, model):
+        obj = {'title': review.title, 'review': review,
+               'comment': Comment.objects.create(
+                   review=review, author=review.author, text='Текст')}[model]
+        url = f'/admin/reviews/{model}/{obj.pk}/change/'
+        add_rows(review.title, review, 0, 3)
+        _, before = count_queries(site_client, url)
+        add_rows(review.title, review, 3, 30)
+        response, after = count_queries(site_client, url)
+        assert len(after) == len(before)
+        content = response.content.decode()
+        assert 'staff5' not in content and 'Админка 5' not in content, (
+            f'Проверьте, что форма {url} не загружает все связанные объекты'
+        )
+
+    def test_autocomplete(self, site_client, review):
+        response = site_client.get('/admin/autocomplete/', {
+            'term': review.title.name[:3], 'app_label': 'reviews',
+            'model_name': 'review', 'field_name': 'title',
+        })
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == [
+            str(review.title.pk)]
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+
+    def test_estimate_used_for_large_table(self, monkeypatch, settings,
+                                           review):
+        settings.ADMIN_ESTIMATED_COUNT_FROM = 1000
+        monkeypatch.setattr(
+            EstimatedCountPaginator, 'estimate', lambda self: 5000)
+        with CaptureQueriesContext(connection) as queries:
+            count = EstimatedCountPaginator(
+                Review.objects.all(), 100).count
+        assert count == 5000
+        assert not queries.captured_queries
+
+    def test_exact_count_for_small_or_filtered(self, monkeypatch, review):
+        assert EstimatedCountPaginator(
+            Review.objects.filter(score=review.score), 100).estimate() is None
+        monkeypatch.setattr(
+            EstimatedCountPaginator, 'estimate', lambda self: 10)
+        assert EstimatedCountPaginator(Review.objects.all(), 100).count == 1
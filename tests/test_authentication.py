@@ -0,0 +1,83 @@
+import pickle
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import user_cache_key
+from api.cache import get_cache
+
+REQUESTS = 20
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+
+    def test_user_is_loaded_once(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        first = count_queries(user_client, url)
+        second = count_queries(user_client, url)
+        assert second == first - 1, (
+            'Проверьте, что пользователь из токена берётся из кеша'
+        )
+
+    def test_role_change_applies_immediately(self, user, user_client,
+                                             django_capture_on_commit_callbacks):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        with django_capture_on_commit_callbacks(execute=True):
+            user.save()
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что сохранение пользователя сбрасывает кеш'
+        )
+
+    def test_object_permission_without_queries(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.patch(url, data={'text': 'Новый текст'})
+        assert response.status_code == 200
+        assert not [
+            query for query in queries
+            if 'FROM "users_user"' in query['sql']
+        ], 'Проверьте, что права автора проверяются без запроса к users_user'
+
+    def test_repeated_requests_skip_user_query(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(REQUESTS):
+                assert user_client.get(url).status_code == 200
+        assert not [
+            query for query in queries
+            if 'FROM "users_user"' in query['sql']
+        ], (
+            f'Проверьте, что {REQUESTS} запросов с одним токеном не читают '
+            'пользователя из БД'
+        )
+
+    def test_cache_holds_no_secrets(self, user, user_client, title):
+        user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        cached = pickle.dumps(get_cache().get(user_cache_key(user.pk)))
+        assert user.username.encode() in cached
+        assert (user.password.encode() not in cached
+                and user.email.encode() not in cached), (
+            'Проверьте, что в кеше нет хеша пароля и почты пользователя'
+        )
+
+    def test_me_returns_full_profile(self, user, user_client):
+        user_client.get('/api/v1/users/me/')
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+        response = user_client.patch('/api/v1/users/me/', {'bio': 'Био'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert (user.bio, user.email) == ('Био', response.json()['email'])
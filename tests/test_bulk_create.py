@@ -0,0 +1,146 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import ReviewBulkCreate
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def titles(category):
+    return [
+        Title.objects.create(name=f'Произведение {i}', year=2000,
+                             category=category)
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestBulkCreate:
+
+    def test_reviews_bulk(self, user_client, titles):
+        payload = [
+            {'title': title.id, 'text': 'Отзыв', 'score': score}
+            for title, score in zip(titles, (10, 6, 1))
+        ]
+        user_client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(
+                '/api/v1/reviews/bulk/', data=payload, format='json')
+        assert response.status_code == 201, response.json()
+        assert [item['status'] for item in response.json()] == [201] * 3
+        assert Review.objects.count() == 3
+        # 4 запроса — пересчёт рейтинговых таблиц для всего пакета,
+        # 3 — гистограмм оценок, 1 — id созданных отзывов вне PostgreSQL.
+        assert len(queries) <= 7 + 4 + 3 + 1 + len(titles), (
+            'Проверьте, что пакет отзывов создаётся одним INSERT и '
+            'проверяется на уникальность одним запросом'
+        )
+
+        reviews = dict(Review.objects.values_list('pk', 'title_id'))
+        assert [reviews.get(item['data']['id'])
+                for item in response.json()] == [
+            title.pk for title in titles], (
+            'Проверьте, что в ответе id созданных отзывов'
+        )
+
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        assert [ratings[title.pk] for title in titles] == [10, 6, 1], (
+            'Проверьте, что пакетное создание обновляет рейтинги'
+        )
+
+    def test_reviews_bulk_partial(self, user_client, user, titles):
+        Review.objects.create(
+            title=titles[0], author=user, text='Уже есть', score=5)
+        payload = [
+            {'title': titles[0].id, 'text': 'Повтор', 'score': 5},
+            {'title': titles[1].id, 'text': 'Отзыв', 'score': 7},
+            {'title': titles[1].id, 'text': 'Дубль в пакете', 'score': 7},
+            {'title': 0, 'text': 'Нет произведения', 'score': 7},
+            {'title': titles[2].id, 'text': 'Оценка вне шкалы', 'score': 11},
+        ]
+        response = user_client.post(
+            '/api/v1/reviews/bulk/', data=payload, format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [
+            400, 201, 400, 400, 400], (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+        assert 'score' in response.json()[4]['errors']
+        assert Review.objects.count() == 2
+
+    def test_reviews_bulk_concurrent_duplicate(self, user_client, user,
+                                               titles, monkeypatch):
+        check_items = ReviewBulkCreate.check_items
+        calls = []
+
+        def racing_check_items(view, validated):
+            results = check_items(view, validated)
+            if not calls:
+                # Параллельный запрос создаёт отзыв после проверки пакета.
+                Review.objects.create(
+                    title=titles[0], author=user, text='Раньше', score=3)
+            calls.append(validated)
+            return results
+
+        monkeypatch.setattr(
+            ReviewBulkCreate, 'check_items', racing_check_items)
+        payload = [
+            {'title': title.id, 'text': 'Отзыв', 'score': 8}
+            for title in titles
+        ]
+        response = user_client.post(
+            '/api/v1/reviews/bulk/', data=payload, format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что конфликт при вставке возвращает ошибку элемента, '
+            'а не 500'
+        )
+        assert [item['status'] for item in response.json()] == [
+            400, 201, 201]
+        assert len(calls) == 2
+        assert Review.objects.get(title=titles[0]).text == 'Раньше'
+        assert Review.objects.count() == 3
+
+    def test_reviews_bulk_validation(self, user_client, anon_client, titles):
+        assert anon_client.post(
+            '/api/v1/reviews/bulk/', data=[], format='json'
+        ).status_code == 401
+        assert user_client.post(
+            '/api/v1/reviews/bulk/', data={'title': 1}, format='json'
+        ).status_code == 400
+
+    def test_comments_bulk(self, user_client, review):
+        payload = [
+            {'review': review.id, 'text': f'Комментарий {i}'}
+            for i in range(5)
+        ] + [{'review': 0, 'text': 'Нет отзыва'}]
+        response = user_client.post(
+            '/api/v1/comments/bulk/', data=payload, format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == (
+            [201] * 5 + [400])
+        assert response.json()[0]['data']['author'] == 'TestUser'
+        assert Comment.objects.filter(review=review).count() == 5
+        comments = dict(Comment.objects.values_list('pk', 'text'))
+        assert [comments.get(item['data']['id'])
+                for item in response.json()[:5]] == [
+            f'Комментарий {i}' for i in range(5)], (
+            'Проверьте, что в ответе id созданных комментариев'
+        )
+
+    def test_single_review_single_title_lookup(self, user_client, titles):
+        user_client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0].id}/reviews/',
+                data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        title_lookups = [
+            query for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+            and '"reviews_title"."name"' in query['sql']
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что произведение запрашивается один раз'
+        )
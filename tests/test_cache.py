@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.checks import check_shared_cache
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_repeated_get_served_from_cache(self, anon_client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        first = anon_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            second = anon_client.get(url)
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert len(queries) == 0, (
+            'Проверьте, что повторный запрос произведения отдаётся из кеша'
+        )
+
+    def test_title_update_invalidates(self, admin_client, anon_client, title,
+                                      django_capture_on_commit_callbacks):
+        anon_client.get('/api/v1/titles/')
+        anon_client.get(f'/api/v1/titles/{title.id}/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_client.patch(
+                f'/api/v1/titles/{title.id}/', data={'name': 'Новое имя'})
+        assert response.status_code == 200
+
+        assert anon_client.get(
+            f'/api/v1/titles/{title.id}/').json()['name'] == 'Новое имя', (
+            'Проверьте, что изменение произведения сбрасывает кеш'
+        )
+        assert anon_client.get(
+            '/api/v1/titles/').json()['results'][0]['name'] == 'Новое имя'
+
+    def test_genre_change_invalidates(self, anon_client, title, genres,
+                                      django_capture_on_commit_callbacks):
+        anon_client.get(f'/api/v1/titles/{title.id}/')
+        with django_capture_on_commit_callbacks(execute=True):
+            title.genre.remove(genres[0])
+
+        response = anon_client.get(f'/api/v1/titles/{title.id}/')
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            genres[1].slug], 'Проверьте, что изменение жанров сбрасывает кеш'
+
+    def test_review_invalidates_rating(self, anon_client, title, user,
+                                       django_capture_on_commit_callbacks):
+        assert anon_client.get(
+            f'/api/v1/titles/{title.id}/').json()['rating'] is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=8)
+
+        assert anon_client.get(
+            f'/api/v1/titles/{title.id}/').json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кеш рейтинга'
+        )
+
+    def test_cache_stats(self, admin_client, anon_client, user_client,
+                         category):
+        anon_client.get('/api/v1/categories/')
+        anon_client.get('/api/v1/categories/')
+
+        assert user_client.get('/api/v1/stats/cache/').status_code == 403
+        response = admin_client.get('/api/v1/stats/cache/')
+        assert response.status_code == 200
+        assert response.json() == {'hit': 1, 'miss': 1, 'hit_ratio': 0.5}
+
+
+class TestSharedCacheCheck:
+
+    def test_warns_about_process_local_cache(self, settings):
+        settings.DEBUG = False
+        assert [error.id for error in check_shared_cache(None)] == [
+            'api.W001']
+
+    def test_silent_with_redis(self, settings):
+        settings.DEBUG = False
+        settings.CACHES = {'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': 'redis://redis:6379/0',
+        }}
+        assert check_shared_cache(None) == []
@@ -0,0 +1,144 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+def urls(review):
+    title_id = review.title_id
+    return (
+        '/api/v1/titles/',
+        f'/api/v1/titles/{title_id}/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        f'/api/v1/titles/{title_id}/reviews/',
+        f'/api/v1/titles/{title_id}/reviews/{review.id}/',
+        f'/api/v1/titles/{title_id}/reviews/{review.id}/comments/',
+    )
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_validators_and_not_modified(self, anon_client, review):
+        for url in urls(review):
+            response = anon_client.get(url)
+            assert response.status_code == 200
+            assert response.has_header('ETag'), (
+                f'Проверьте, что {url} отдаёт ETag'
+            )
+            assert response.has_header('Last-Modified')
+
+            with CaptureQueriesContext(connection) as queries:
+                not_modified = anon_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+            assert not_modified.status_code == 304, (
+                f'Проверьте, что {url} отвечает 304 на совпавший ETag'
+            )
+            assert not_modified.content == b''
+            assert not_modified['ETag'] == response['ETag']
+            assert len(queries) == 0, (
+                f'Проверьте, что 304 для {url} отдаётся без запросов к БД'
+            )
+
+    def test_if_modified_since(self, anon_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response = anon_client.get(url)
+        assert anon_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 304
+
+    def test_change_updates_etag(self, anon_client, review, admin,
+                                 django_capture_on_commit_callbacks):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        reviews_etag = anon_client.get(reviews_url)['ETag']
+        comments_etag = anon_client.get(comments_url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=review.title, author=admin, text='Новый', score=3)
+            Comment.objects.create(review=review, author=admin, text='Да')
+
+        for url, etag in ((reviews_url, reviews_etag),
+                          (comments_url, comments_etag)):
+            response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что изменение данных меняет ETag {url}'
+            )
+            assert response['ETag'] != etag
+
+    def test_other_title_keeps_detail_etag(
+            self, anon_client, review, admin,
+            django_capture_on_commit_callbacks):
+        detail_url = f'/api/v1/titles/{review.title_id}/'
+        list_url = '/api/v1/titles/'
+        etags = {url: anon_client.get(url)['ETag']
+                 for url in (detail_url, list_url)}
+        other = Title.objects.create(name='Другое', year=2000)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=other, author=admin, text='Отзыв', score=3)
+        with CaptureQueriesContext(connection) as queries:
+            response = anon_client.get(
+                detail_url, HTTP_IF_NONE_MATCH=etags[detail_url])
+        assert response.status_code == 304, (
+            'Проверьте, что отзыв на другое произведение не меняет ETag '
+            'произведения'
+        )
+        assert len(queries) == 0
+        assert anon_client.get(
+            list_url, HTTP_IF_NONE_MATCH=etags[list_url]).status_code == 200
+
+    @pytest.mark.parametrize('command', ('rebuild_ratings', 'import_csv'))
+    def test_data_commands_update_etag(self, anon_client, review, command,
+                                       tmp_path,
+                                       django_capture_on_commit_callbacks):
+        etags = {url: anon_client.get(url)['ETag'] for url in urls(review)}
+        args = ('--path', str(tmp_path)) if command == 'import_csv' else ()
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command(command, *args, stdout=StringIO())
+        for url, etag in etags.items():
+            assert anon_client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+                f'Проверьте, что {command} меняет ETag {url}'
+            )
+
+    def test_user_save_keeps_unrelated_etags(
+            self, anon_client, review, admin,
+            django_capture_on_commit_callbacks):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        Comment.objects.create(review=review, author=review.author,
+                               text='Свой комментарий')
+        etags = {url: anon_client.get(url)['ETag']
+                 for url in (reviews_url, comments_url)}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            admin.first_name = 'Администратор'
+            admin.save()
+            anon_client.post('/api/v1/auth/signup/', data={
+                'username': 'newcomer', 'email': 'newcomer@yamdb.fake'})
+            review.author.bio = 'Новая биография'
+            review.author.save()
+        for url, etag in etags.items():
+            assert anon_client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+                'Проверьте, что сохранение пользователя без смены имени '
+                f'не меняет ETag {url}'
+            )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            review.author.username = 'renamed'
+            review.author.save()
+        for url, etag in etags.items():
+            response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что смена имени автора меняет ETag {url}'
+            )
+            assert 'renamed' in response.content.decode()
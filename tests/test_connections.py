@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+
+
+@pytest.fixture(autouse=True)
+def idle_connection(monkeypatch):
+    """Соединение не помечено недавним запросом из другого теста."""
+    monkeypatch.setattr(connection, 'health_check_after', 0, raising=False)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPersistentConnections:
+
+    def test_broken_connection_closed_before_request(self, monkeypatch,
+                                                     anon_client):
+        connection.ensure_connection()
+        closed = []
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        monkeypatch.setattr(
+            connection, 'close', lambda: closed.append(True))
+        anon_client.get('/api/v1/categories/')
+        assert closed, (
+            'Проверьте, что разорванное соединение с БД закрывается '
+            'перед обработкой запроса'
+        )
+
+    def test_health_check_can_be_disabled(self, monkeypatch, settings,
+                                          anon_client):
+        settings.DB_CONN_HEALTH_CHECKS = False
+        connection.ensure_connection()
+        checked = []
+        monkeypatch.setattr(
+            connection, 'is_usable', lambda: checked.append(True) or True)
+        anon_client.get('/api/v1/categories/')
+        assert not checked, (
+            'Проверьте, что при DB_CONN_HEALTH_CHECKS=False соединение '
+            'не проверяется'
+        )
+
+    def test_recently_used_connection_not_checked(self, monkeypatch,
+                                                  settings, anon_client):
+        anon_client.get('/api/v1/categories/')
+        checked = []
+        monkeypatch.setattr(
+            connection, 'is_usable', lambda: checked.append(True) or True)
+        anon_client.get('/api/v1/categories/')
+        assert not checked, (
+            'Проверьте, что соединение, только что обслужившее запрос, '
+            'не проверяется перед следующим'
+        )
+
+        settings.DB_CONN_HEALTH_CHECK_IDLE = 0
+        anon_client.get('/api/v1/categories/')
+        anon_client.get('/api/v1/categories/')
+        assert checked, (
+            'Проверьте, что простаивавшее соединение проверяется'
+        )
@@ -0,0 +1,162 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews import deletion
+from reviews.models import (Comment, LeaderboardEntry, PendingDeletion,
+                            Review, ScoreHistogram, Title)
+from users.models import User
+
+
+@pytest.fixture
+def busy(title, user, admin, settings):
+    """Два произведения: у первого три отзыва с комментариями, отзыв user
+    есть на обоих. Лимит удаления в запросе — 2 строки."""
+    settings.DELETE_INLINE_LIMIT = 2
+    other = Title.objects.create(name='Второе', year=2001)
+    critics = [
+        User.objects.create_user(username=f'critic{i}',
+                                 email=f'critic{i}@yamdb.fake')
+        for i in range(2)
+    ]
+    for author, score in zip([user, *critics], (10, 6, 2)):
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score)
+        Comment.objects.create(review=review, author=admin, text='Да')
+        Comment.objects.create(review=review, author=user, text='Нет')
+    Review.objects.create(title=other, author=user, text='Отзыв', score=8)
+    Review.objects.create(title=other, author=admin, text='Отзыв', score=4)
+    return title, other
+
+
+def purge():
+    call_command('purge_deleted', '--once', '--batch-size', '2',
+                 stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestDeferredDelete:
+
+    def test_small_title_deleted_in_request(self, admin_client, title,
+                                            review):
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 204
+        assert not Title.objects.exists()
+        assert not PendingDeletion.objects.exists()
+
+    def test_inline_delete_skips_review_signals(self, admin_client,
+                                                settings):
+        settings.DELETE_INLINE_LIMIT = 100
+
+        def delete_queries(count):
+            title = Title.objects.create(name=f'С {count}', year=2000)
+            for i in range(count):
+                author = User.objects.create_user(
+                    username=f'c{count}_{i}', email=f'c{count}_{i}@yamdb.fake')
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=5)
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+            assert response.status_code == 204
+            assert not Review.objects.filter(title_id=title.pk).exists()
+            return len(queries)
+
+        delete_queries(1)
+        assert delete_queries(2) == delete_queries(30), (
+            'Проверьте, что удаление в запросе не вызывает обработчики '
+            'сигналов для каждого отзыва'
+        )
+
+    def test_large_title_scheduled(self, admin_client, anon_client, busy):
+        title, _ = busy
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 202
+        assert Title.objects.filter(pk=title.pk, is_deleted=True).exists()
+        assert PendingDeletion.objects.filter(
+            kind='title', object_id=title.pk).exists()
+
+        assert anon_client.get(
+            f'/api/v1/titles/{title.id}/').status_code == 404
+        assert anon_client.get(
+            f'/api/v1/titles/{title.id}/reviews/').status_code == 404
+        assert title.id not in [
+            item['id'] for item in anon_client.get(
+                '/api/v1/titles/').json()['results']]
+        assert not LeaderboardEntry.objects.filter(title=title).exists()
+
+    def test_scheduled_title_drops_comment_etag(
+            self, admin_client, anon_client, busy,
+            django_capture_on_commit_callbacks):
+        title, _ = busy
+        review = title.reviews.first()
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        etag = anon_client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert anon_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 404, (
+            'Проверьте, что комментарии удаляемого произведения '
+            'не отдаются по старому ETag'
+        )
+
+    def test_alive_querysets(self, busy):
+        title, other = busy
+        deletion.schedule(title)
+        assert list(Title.objects.alive()) == [other]
+        assert set(Review.objects.alive().values_list(
+            'title', flat=True)) == {other.pk}
+        assert not Comment.objects.alive().exists()
+        assert Comment.objects.filter(review__title=title).exists(), (
+            'Проверьте, что обычный менеджер видит удаляемые объекты'
+        )
+
+    def test_title_purged_in_batches(self, admin_client, busy):
+        title, other = busy
+        admin_client.delete(f'/api/v1/titles/{title.id}/')
+        with CaptureQueriesContext(connection) as queries:
+            purge()
+        assert not Title.objects.filter(pk=title.pk).exists()
+        assert not Review.objects.filter(title_id=title.pk).exists()
+        assert not PendingDeletion.objects.exists()
+        assert Review.objects.filter(title=other).count() == 2
+        assert not any(
+            query['sql'].startswith('SELECT')
+            and '"reviews_comment"."text"' in query['sql']
+            for query in queries.captured_queries), (
+            'Проверьте, что комментарии удаляются без загрузки моделей'
+        )
+
+    def test_user_purged_with_correct_ratings(self, admin_client, busy,
+                                              user):
+        title, other = busy
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 202
+        user.refresh_from_db()
+        assert not user.is_active
+
+        purge()
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert not Comment.objects.filter(author_id=user.pk).exists()
+        assert Comment.objects.count() == 2
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            8, 2, 4)
+        assert (other.score_count, other.rating) == (1, 4)
+        assert not Title.objects.drifted().exists()
+        assert not ScoreHistogram.objects.drifted().exists()
+        assert LeaderboardEntry.objects.get(
+            board='top', title=other).score == 4
+
+    def test_scheduled_user_cannot_authenticate(self, busy, user,
+                                                user_client):
+        deletion.schedule(user)
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 401
+
+    def test_is_large_counts_are_bounded(self, busy, user):
+        assert deletion.is_large(user, limit=2)
+        assert not deletion.is_large(user, limit=100)
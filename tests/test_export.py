@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+
+def read_ndjson(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+@pytest.fixture
+def history(title, review, admin):
+    Title.objects.create(name='Без жанров', year=2001)
+    old = Review.objects.create(
+        title=Title.objects.get(name='Без жанров'), author=admin,
+        text='Старый отзыв', score=4)
+    Review.objects.filter(pk=old.pk).update(
+        pub_date=timezone.now() - timedelta(days=10))
+    Comment.objects.create(review=review, author=admin, text='Комментарий')
+    return review
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_admin_only(self, anon_client, user_client):
+        assert anon_client.get('/api/v1/export/titles/').status_code == 401
+        assert user_client.get('/api/v1/export/titles/').status_code == 403
+
+    def test_titles_ndjson(self, admin_client, history, title):
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся StreamingHttpResponse')
+        rows = read_ndjson(b''.join(response.streaming_content))
+        assert [row['id'] for row in rows] == sorted(
+            Title.objects.values_list('pk', flat=True))
+        exported = next(row for row in rows if row['id'] == title.id)
+        assert exported['genre'] == ['comedy', 'drama']
+        assert exported['category'] == 'movie'
+        assert exported['rating'] == 10
+
+    def test_reviews_csv_since(self, admin_client, history):
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response = admin_client.get(
+            f'/api/v1/export/reviews/?output=csv&since={since}')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(
+            b''.join(response.streaming_content).decode())))
+        assert [int(row['id']) for row in rows] == [history.id], (
+            'Проверьте, что since отбирает только новые отзывы'
+        )
+        assert rows[0]['author'] == history.author.username
+
+    def test_bad_requests(self, admin_client):
+        assert admin_client.get(
+            '/api/v1/export/users/').status_code == 404
+        assert admin_client.get(
+            '/api/v1/export/reviews/?output=xml').status_code == 404
+        assert admin_client.get(
+            '/api/v1/export/reviews/?since=вчера').status_code == 400
+
+    def test_command_matches_endpoint(self, admin_client, history):
+        expected = b''.join(admin_client.get(
+            '/api/v1/export/comments/').streaming_content).decode()
+        output = io.StringIO()
+        call_command('export_data', 'comments', '--chunk-size', '1',
+                     stdout=output)
+        assert output.getvalue() == expected
+        rows = read_ndjson(expected.encode())
+        assert rows[0]['review'] == history.id
+        assert rows[0]['title'] == history.title_id
+
+    def test_command_chunks_titles(self, history, tmp_path):
+        path = tmp_path / 'titles.csv'
+        call_command('export_data', 'titles', '--format', 'csv',
+                     '--chunk-size', '1', '--output', str(path))
+        rows = list(csv.DictReader(path.open(encoding='utf-8')))
+        assert len(rows) == Title.objects.count()
+        assert {row['genre'] for row in rows} == {'comedy,drama', ''}
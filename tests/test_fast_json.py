@@ -0,0 +1,95 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+from api.row_serializers import RowSerializer
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def catalogue(title, review, admin, user):
+    Title.objects.create(name='Без категории', year=2001, description=None)
+    tricky = Title.objects.create(
+        name='Строка\u2028с разделителем "и кавычками"', year=1999,
+        category=title.category)
+    tricky.genre.set(title.genre.all())
+    Review.objects.create(
+        title=title, author=admin, text='Ещё отзыв\nс переносом', score=3)
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    Comment.objects.create(review=review, author=admin, text='Ответ \u2029')
+    return title, review
+
+
+@pytest.mark.django_db
+class TestFastJSON:
+
+    def urls(self, title, review):
+        return (
+            '/api/v1/titles/',
+            '/api/v1/titles/?ordering=-year',
+            '/api/v1/titles/?genre=drama&page=1',
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        )
+
+    def test_byte_identical_output(self, anon_client, catalogue, settings,
+                                   monkeypatch):
+        title, review = catalogue
+        calls = []
+        original = RowSerializer.data
+        monkeypatch.setattr(
+            RowSerializer, 'data',
+            lambda self, rows: calls.append(self) or original(self, rows))
+        for url in self.urls(title, review):
+            settings.FAST_JSON = False
+            cache.clear()
+            expected = anon_client.get(url)
+            settings.FAST_JSON = True
+            cache.clear()
+            response = anon_client.get(url)
+            assert response.status_code == expected.status_code == 200
+            assert response.content == expected.content, (
+                f'Проверьте, что {url} с FAST_JSON отдаёт тот же ответ '
+                'байт в байт'
+            )
+        assert len(calls) == len(self.urls(title, review)), (
+            'Проверьте, что при FAST_JSON списки строятся по .values()'
+        )
+
+    def test_cursor_links_follow(self, anon_client, catalogue, settings):
+        title, _ = catalogue
+        settings.FAST_JSON = True
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        first = anon_client.get(url).json()
+        assert first['results']
+        settings.FAST_JSON = False
+        assert anon_client.get(url).json() == first
+
+
+class TestORJSONRenderer:
+
+    def render(self, renderer, data, media_type=None):
+        return renderer.render(data, media_type, {})
+
+    @pytest.mark.parametrize('data', [
+        {'text': 'юникод \u2028 и \u2029', 'n': [1, 2.5, None, True]},
+        {'date': timezone.make_aware(datetime(2022, 1, 2, 3, 4, 5),
+                                     timezone.utc),
+         'amount': Decimal('1.50')},
+        [],
+    ])
+    def test_same_as_json_renderer(self, data):
+        assert self.render(ORJSONRenderer(), data) == self.render(
+            JSONRenderer(), data)
+
+    def test_indent_falls_back(self):
+        media_type = 'application/json; indent=4'
+        data = {'a': [1, 2]}
+        assert self.render(ORJSONRenderer(), data, media_type) == (
+            self.render(JSONRenderer(), data, media_type))
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalogue(category, genres):
+    book = Category.objects.create(name='Книга', slug='book')
+    Genre.objects.create(name='Драматургия', slug='drama-theatre')
+    drama, comedy = genres
+    both = Title.objects.create(name='Трагикомедия', year=2000,
+                                category=category)
+    both.genre.set((drama, comedy))
+    Title.objects.create(
+        name='Драма', year=2000, category=category).genre.set((drama,))
+    Title.objects.create(
+        name='Роман', year=2000, category=book).genre.set((comedy,))
+    Title.objects.create(
+        name='Пьеса', year=2000, category=book).genre.set(
+        Genre.objects.filter(slug='drama-theatre'))
+
+
+def names(response):
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSlugFilters:
+
+    def test_genre_exact(self, anon_client, catalogue):
+        assert names(anon_client.get('/api/v1/titles/?genre=drama')) == [
+            'Драма', 'Трагикомедия'], (
+            'Проверьте, что фильтр по жанру сравнивает слаг целиком'
+        )
+
+    def test_several_genres_without_duplicates(self, anon_client, catalogue):
+        response = anon_client.get('/api/v1/titles/?genre=drama,comedy')
+        assert names(response) == ['Драма', 'Роман', 'Трагикомедия'], (
+            'Проверьте, что ?genre=drama,comedy возвращает каждое '
+            'произведение один раз'
+        )
+        assert response.json()['count'] == 3
+
+    def test_category(self, anon_client, catalogue):
+        assert names(anon_client.get('/api/v1/titles/?category=book')) == [
+            'Пьеса', 'Роман']
+        assert names(anon_client.get('/api/v1/titles/?category=boo')) == []
+        assert len(names(anon_client.get(
+            '/api/v1/titles/?category=book,movie'))) == 4
+
+    def test_generated_sql(self, anon_client, catalogue):
+        with CaptureQueriesContext(connection) as queries:
+            anon_client.get('/api/v1/titles/?genre=drama,comedy&category=movie')
+        title_queries = [
+            query['sql'] for query in queries
+            if 'FROM "reviews_title"' in query['sql']
+        ]
+        assert title_queries
+        for sql in title_queries:
+            assert 'LIKE' not in sql, (
+                'Проверьте, что фильтры по слагам не используют LIKE'
+            )
+            assert 'DISTINCT' not in sql
+            assert 'EXISTS' in sql, (
+                'Проверьте, что фильтр по жанрам выполняется полусоединением'
+            )
+            assert sql.count('"reviews_title_genre"') == 1, (
+                'Проверьте, что таблица жанров произведений не '
+                'присоединяется к основному запросу'
+            )
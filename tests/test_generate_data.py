@@ -0,0 +1,79 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, Title)
+from users.models import User
+
+
+def generate(*args):
+    call_command('generate_data', '--titles', '30', '--genres', '4',
+                 '--categories', '2', '--users', '10', '--writers', '3',
+                 '--reviews-per-title', '3', *args, stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_creates_consistent_data(self, tmp_path):
+        manifest_path = tmp_path / 'bench.json'
+        generate('--manifest', str(manifest_path))
+
+        assert Title.objects.count() == 30
+        assert Genre.objects.count() == 4
+        assert Category.objects.count() == 2
+        assert User.objects.filter(username__startswith='bench_').count() \
+            == 13
+        assert Review.objects.exists()
+        assert not Title.objects.drifted().exists()
+        assert LeaderboardEntry.objects.filter(board='top').exists()
+
+        manifest = json.loads(manifest_path.read_text())
+        assert sorted(manifest['titles']) == sorted(
+            Title.objects.values_list('pk', flat=True))
+        assert len(manifest['writers']) == 3
+        title_id, review_id = manifest['reviews'][0]
+        assert Review.objects.filter(pk=review_id,
+                                     title_id=title_id).exists()
+
+    def test_is_reproducible_with_clear(self):
+        generate()
+        first = list(Review.objects.order_by('pk').values_list(
+            'title__name', 'author__username', 'score'))
+        generate('--clear')
+        second = list(Review.objects.order_by('pk').values_list(
+            'title__name', 'author__username', 'score'))
+        assert Title.objects.count() == 30
+        assert len(first) == len(second)
+        assert [row[2] for row in first] == [row[2] for row in second]
+
+    def test_clear_keeps_other_data(self, review):
+        comment = Comment.objects.create(
+            review=review, author=review.author, text='Комментарий')
+        generate()
+        generate('--clear')
+        assert Title.objects.count() == 31
+        assert Review.objects.filter(pk=review.pk).exists()
+        assert Comment.objects.filter(pk=comment.pk).exists()
+
+    def test_writer_token_posts_review(self, client, tmp_path):
+        manifest_path = tmp_path / 'bench.json'
+        generate('--manifest', str(manifest_path))
+        manifest = json.loads(manifest_path.read_text())
+
+        response = client.post(
+            f'/api/v1/titles/{manifest["titles"][0]}/reviews/',
+            data={'text': 'Новый отзыв', 'score': 7},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {manifest["writers"][0]}',
+        )
+
+        assert response.status_code == 201
+
+    def test_requires_enough_users(self):
+        with pytest.raises(CommandError):
+            call_command('generate_data', '--users', '5',
+                         '--reviews-per-title', '3', stdout=StringIO())
@@ -0,0 +1,48 @@
+import csv
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    @pytest.mark.parametrize('batch_size', (1, 7, 5000))
+    def test_import_csv(self, batch_size):
+        call_command('import_csv', batch_size=batch_size, verbosity=0)
+
+        for filename, queryset in (
+            ('users.csv', User.objects.all()),
+            ('category.csv', Category.objects.all()),
+            ('genre.csv', Genre.objects.all()),
+            ('titles.csv', Title.objects.all()),
+            ('genre_title.csv', Title.genre.through.objects.all()),
+            ('review.csv', Review.objects.all()),
+            ('comments.csv', Comment.objects.all()),
+        ):
+            assert queryset.count() == len(csv_rows(filename)), (
+                f'Проверьте, что import_csv загружает все строки {filename}'
+            )
+
+        first_review = csv_rows('review.csv')[0]
+        review = Review.objects.get(pk=first_review['id'])
+        assert review.pub_date.isoformat().startswith(
+            first_review['pub_date'][:19]), (
+            'Проверьте, что import_csv сохраняет даты отзывов из файла'
+        )
+        assert not Title.objects.drifted().exists(), (
+            'Проверьте, что после импорта рейтинги произведений пересчитаны'
+        )
+        call_command('rebuild_ratings', '--check', verbosity=0)
@@ -0,0 +1,219 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import (Category, Genre, LeaderboardEntry, Review,
+                            Title)
+from users.models import User
+
+
+@pytest.fixture
+def rated_titles(category, genres):
+    """Три произведения с рейтингами 9, 6 и 3; третье — в другой
+    категории и без жанров."""
+    other = Category.objects.create(name='Книга', slug='book')
+    users = [
+        User.objects.create_user(username=f'voter{i}',
+                                 email=f'voter{i}@yamdb.fake')
+        for i in range(2)
+    ]
+    titles = []
+    for name, title_category, scores in (
+            ('Первое', category, (10, 8)),
+            ('Второе', category, (6,)),
+            ('Третье', other, (3,))):
+        title = Title.objects.create(
+            name=name, year=2000, category=title_category)
+        if title_category == category:
+            title.genre.set(genres[:1] if name == 'Второе' else genres)
+        for user, score in zip(users, scores):
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=score)
+        titles.append(title)
+    return titles
+
+
+def board_ids(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что {url} доступен без авторизации'
+    )
+    return [entry['title']['id'] for entry in response.json()]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_top_rated(self, anon_client, rated_titles):
+        first, second, third = rated_titles
+        assert board_ids(anon_client, '/api/v1/leaderboards/top/') == [
+            first.id, second.id, third.id]
+        response = anon_client.get('/api/v1/leaderboards/top/?limit=1')
+        assert response.json() == [{
+            'score': 9.0,
+            'title': anon_client.get(f'/api/v1/titles/{first.id}/').json(),
+        }]
+
+    def test_top_by_genre_and_category(self, anon_client, rated_titles):
+        first, second, third = rated_titles
+        assert board_ids(
+            anon_client, '/api/v1/leaderboards/top/genres/comedy/'
+        ) == [first.id]
+        assert board_ids(
+            anon_client, '/api/v1/leaderboards/top/genres/drama/'
+        ) == [first.id, second.id]
+        assert board_ids(
+            anon_client, '/api/v1/leaderboards/top/categories/book/'
+        ) == [third.id]
+        response = anon_client.get('/api/v1/leaderboards/top/genres/none/')
+        assert response.status_code == 404
+
+    def test_updated_with_reviews(self, anon_client, rated_titles,
+                                  django_capture_on_commit_callbacks):
+        first, second, third = rated_titles
+        assert board_ids(anon_client, '/api/v1/leaderboards/top/')[0] == (
+            first.id)
+        review = third.reviews.get()
+        review.score = 10
+        with django_capture_on_commit_callbacks(execute=True):
+            review.save()
+        assert board_ids(anon_client, '/api/v1/leaderboards/top/')[0] == (
+            third.id), 'Проверьте, что таблица обновляется при правке отзыва'
+        with django_capture_on_commit_callbacks(execute=True):
+            second.reviews.get().delete()
+        assert second.id not in board_ids(
+            anon_client, '/api/v1/leaderboards/top/'), (
+            'Проверьте, что произведение без отзывов выбывает из таблицы'
+        )
+
+    def test_updated_with_title_genres(self, anon_client, rated_titles):
+        first, second, third = rated_titles
+        second.genre.add(Genre.objects.get(slug='comedy'))
+        assert board_ids(
+            anon_client, '/api/v1/leaderboards/top/genres/comedy/'
+        ) == [first.id, second.id]
+        third.category = Category.objects.get(slug='movie')
+        third.save()
+        assert board_ids(
+            anon_client, '/api/v1/leaderboards/top/categories/book/') == []
+
+    def test_trending(self, anon_client, rated_titles,
+                      django_capture_on_commit_callbacks):
+        first, second, third = rated_titles
+        assert board_ids(anon_client, '/api/v1/leaderboards/trending/')[0] == (
+            first.id), 'Проверьте, что популярные сортируются по числу отзывов'
+        Review.objects.filter(title=first).update(
+            pub_date=timezone.now() - timedelta(days=30))
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command('refresh_leaderboards', '--trending',
+                         stdout=StringIO())
+        assert first.id not in board_ids(
+            anon_client, '/api/v1/leaderboards/trending/'), (
+            'Проверьте, что старые отзывы выбывают из таблицы популярных'
+        )
+
+    def test_incremental_matches_rebuild(self, rated_titles):
+        third = rated_titles[2]
+        review = third.reviews.get()
+        review.score = 7
+        review.save()
+        rated_titles[0].genre.clear()
+
+        def snapshot():
+            return set(LeaderboardEntry.objects.values_list(
+                'board', 'title_id', 'score'))
+
+        incremental = snapshot()
+        LeaderboardEntry.objects.rebuild()
+        assert incremental == snapshot(), (
+            'Проверьте, что инкрементальное обновление таблиц совпадает '
+            'с полным пересчётом'
+        )
+
+    def test_read_cost_does_not_depend_on_titles(self, anon_client,
+                                                 rated_titles, user):
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                anon_client.get('/api/v1/leaderboards/top/?limit=2')
+            return len(context)
+
+        before = queries()
+        for number in range(10):
+            title = Title.objects.create(name=f'Ещё {number}', year=2000)
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=5)
+        assert queries() == before
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != 'postgresql',
+                    reason='Блокировка нужна только PostgreSQL')
+class TestLeaderboardConcurrency:
+
+    @staticmethod
+    def start(target, *args):
+        """Запустить target в отдельном потоке со своим соединением;
+        через 0.5 с вернуть поток и список ошибок."""
+        errors = []
+
+        def run():
+            try:
+                target(*args)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(timeout=0.5)
+        return thread, errors
+
+    def test_concurrent_refresh(self, rated_titles):
+        title = rated_titles[0]
+        entries = LeaderboardEntry.objects.filter(title=title).count()
+        with transaction.atomic():
+            LeaderboardEntry.objects.refresh([title.pk])
+            thread, errors = self.start(
+                LeaderboardEntry.objects.refresh, [title.pk])
+            assert thread.is_alive(), (
+                'Проверьте, что пересчёт ждёт незавершённый соседний'
+            )
+        thread.join()
+        assert not errors, (
+            'Проверьте, что одновременные пересчёты таблиц не нарушают '
+            f'unique_board_title: {errors}'
+        )
+        assert LeaderboardEntry.objects.filter(
+            title=title).count() == entries
+
+    def test_other_titles_not_blocked(self, rated_titles):
+        first, second, _ = rated_titles
+        with transaction.atomic():
+            LeaderboardEntry.objects.refresh([first.pk])
+            thread, errors = self.start(
+                LeaderboardEntry.objects.refresh, [second.pk])
+            assert not thread.is_alive(), (
+                'Проверьте, что пересчёт одного произведения не ждёт '
+                'пересчёта другого'
+            )
+        assert not errors
+
+    def test_rebuild_waits_for_refresh(self, rated_titles):
+        with transaction.atomic():
+            LeaderboardEntry.objects.refresh([rated_titles[0].pk])
+            thread, errors = self.start(
+                LeaderboardEntry.objects.rebuild_trending)
+            assert thread.is_alive(), (
+                'Проверьте, что полный пересчёт ждёт пересчёт произведения'
+            )
+        thread.join()
+        assert not errors
@@ -0,0 +1,67 @@
+import logging
+import re
+
+import pytest
+
+from api.metrics import registry
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.clear()
+
+
+@pytest.mark.django_db
+class TestPerformanceMetrics:
+
+    def test_server_timing_header(self, anon_client, title):
+        response = anon_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        timing = response.get('Server-Timing', '')
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+        assert match and int(match.group(1)) > 0, (
+            'Проверьте, что в заголовке Server-Timing есть число '
+            'SQL-запросов и время в БД'
+        )
+        for section in ('serialize;dur=', 'app;dur=', 'total;dur='):
+            assert section in timing, (
+                f'Проверьте, что в Server-Timing есть {section}'
+            )
+
+    def test_metrics_by_view_name(self, anon_client, admin_client, title):
+        anon_client.get('/api/v1/titles/')
+        anon_client.get('/api/v1/titles/')
+        assert registry.get(
+            'yamdb_http_requests_total',
+            view='api:title-list', method='GET', status=200) == 2
+        response = admin_client.get('/api/v1/stats/metrics/')
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert ('yamdb_db_queries_count{view="api:title-list"} 2'
+                in body), (
+            'Проверьте, что метрики отдаются в формате Prometheus '
+            'с меткой имени представления'
+        )
+        assert 'yamdb_serialize_duration_seconds_total' in body
+        assert 'yamdb_http_response_size_bytes_total' in body
+
+    def test_metrics_for_admin_only(self, anon_client, user_client):
+        assert anon_client.get('/api/v1/stats/metrics/').status_code == 401
+        assert user_client.get('/api/v1/stats/metrics/').status_code == 403
+
+    def test_query_budget_exceeded(self, anon_client, title, settings,
+                                   caplog):
+        settings.QUERY_COUNT_BUDGET = 1
+        with caplog.at_level(logging.WARNING, logger='api.performance'):
+            anon_client.get('/api/v1/titles/')
+        assert any('api:title-list' in record.getMessage()
+                   for record in caplog.records), (
+            'Проверьте, что превышение QUERY_COUNT_BUDGET логируется'
+        )
+        assert registry.get('yamdb_query_budget_exceeded_total',
+                            view='api:title-list') == 1
+
+    def test_metrics_can_be_disabled(self, anon_client, title, settings):
+        settings.PERFORMANCE_METRICS = False
+        response = anon_client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
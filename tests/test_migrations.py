@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+
+# Схема, которую makemigrations создавал на сервере до появления
+# миграций в репозитории.
+BASELINE = [('reviews', '0002_initial'), ('users', '0001_initial')]
+
+
+@pytest.fixture
+def upgrade_db(db, settings, tmp_path):
+    """Отдельная база SQLite, в которой миграции включены (тесты идут
+    с --nomigrations)."""
+    settings.MIGRATION_MODULES = {}
+    settings.DATABASE_ROUTERS = []
+    connections.settings['upgrade'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'upgrade.sqlite3'),
+    }
+    yield connections['upgrade']
+    connections['upgrade'].close()
+    del connections['upgrade']
+    del connections.settings['upgrade']
+
+
+@pytest.mark.django_db
+class TestMigrations:
+
+    def test_migrations_match_models(self, settings):
+        settings.MIGRATION_MODULES = {}
+        call_command('makemigrations', '--check', '--dry-run',
+                     stdout=StringIO())
+
+    def test_upgrade_existing_database(self, upgrade_db):
+        executor = MigrationExecutor(upgrade_db)
+        executor.migrate(BASELINE)
+        old = executor.loader.project_state(BASELINE).apps
+        users = old.get_model('users', 'User').objects.using('upgrade')
+        title = old.get_model('reviews', 'Title').objects.using(
+            'upgrade').create(name='Старое', year=2000)
+        for score in (4, 8):
+            old.get_model('reviews', 'Review').objects.using('upgrade').create(
+                title=title, text='Отзыв', score=score,
+                author=users.create(username=f'old{score}',
+                                    email=f'old{score}@yamdb.fake'))
+
+        executor = MigrationExecutor(upgrade_db)
+        leaves = executor.loader.graph.leaf_nodes()
+        executor.migrate(leaves)
+        new = executor.loader.project_state(leaves).apps
+        title = new.get_model('reviews', 'Title').objects.using(
+            'upgrade').get(pk=title.pk)
+        assert (title.score_sum, title.score_count, title.rating) == (
+            12, 2, 6.0), (
+            'Проверьте, что миграции заполняют агрегаты оценок '
+            'у существующих произведений'
+        )
+        assert not title.is_deleted
@@ -0,0 +1,66 @@
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+from users.models import OutgoingEmail
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected('Соединение разорвано')
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_only_queues_email(self, anon_client):
+        response = anon_client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'newuser@yamdb.fake'
+        assert email.status == OutgoingEmail.PENDING
+
+    def test_send_emails_in_batches(self, anon_client):
+        for i in range(5):
+            anon_client.post(
+                '/api/v1/auth/signup/',
+                data={'username': f'user{i}', 'email': f'user{i}@yamdb.fake'}
+            )
+        call_command('send_emails', '--once', batch_size=2)
+
+        assert len(mail.outbox) == 5, (
+            'Проверьте, что send_emails отправляет все письма из очереди'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT).exists()
+        assert 'Ваш код' in mail.outbox[0].body
+
+    def test_retry_with_backoff(self, anon_client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        anon_client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        )
+        call_command('send_emails', '--once', max_attempts=2, retry_delay=60)
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.attempts) == (OutgoingEmail.PENDING, 1), (
+            'Проверьте, что письмо с ошибкой отправки откладывается'
+        )
+        assert 'SMTPServerDisconnected' in email.last_error
+
+        OutgoingEmail.objects.update(next_attempt=email.created)
+        call_command('send_emails', '--once', max_attempts=2, retry_delay=60)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.FAILED, 2), (
+            'Проверьте, что после max_attempts письмо помечается неотправленным'
+        )
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review
+from users.models import User
+
+TOTAL = 23
+
+
+@pytest.fixture
+def many_reviews(title):
+    User.objects.bulk_create(
+        User(username=f'author{i}', email=f'author{i}@yamdb.fake')
+        for i in range(TOTAL)
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв', score=5)
+        for author in User.objects.filter(username__startswith='author')
+    )
+    # Одинаковые даты проверяют, что курсор учитывает id при равенстве pub_date
+    Review.objects.update(pub_date=timezone.now())
+    return list(Review.objects.order_by('pub_date', 'id').values_list(
+        'id', flat=True))
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def walk(self, client, url):
+        ids, queries_per_page = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            ids.extend(item['id'] for item in data['results'])
+            queries_per_page.append(len(queries))
+            url = data['next']
+        return ids, queries_per_page
+
+    def test_reviews_cursor(self, anon_client, title, many_reviews):
+        ids, queries_per_page = self.walk(
+            anon_client,
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        )
+        assert ids == many_reviews, (
+            'Проверьте, что курсорная пагинация отдаёт все отзывы по порядку '
+            'без пропусков и повторов'
+        )
+        assert set(queries_per_page) == {2}, (
+            'Проверьте, что курсорная пагинация не выполняет COUNT(*)'
+        )
+
+    def test_previous_link(self, anon_client, title, many_reviews):
+        first = anon_client.get(
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor').json()
+        assert first['previous'] is None
+        second = anon_client.get(first['next']).json()
+        back = anon_client.get(second['previous']).json()
+        assert back['results'] == first['results'], (
+            'Проверьте ссылку на предыдущую страницу курсорной пагинации'
+        )
+
+    def test_comments_cursor(self, anon_client, review, many_reviews):
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий')
+            for author in User.objects.filter(username__startswith='author')
+        )
+        expected = list(Comment.objects.order_by('pub_date', 'id').values_list(
+            'id', flat=True))
+        ids, _ = self.walk(
+            anon_client,
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+            '?pagination=cursor'
+        )
+        assert ids == expected
+
+    def test_page_number_by_default(self, anon_client, title, many_reviews):
+        data = anon_client.get(f'/api/v1/titles/{title.id}/reviews/').json()
+        assert data['count'] == TOTAL, (
+            'Проверьте, что без ?pagination=cursor пагинация не изменилась'
+        )
+
+    def test_invalid_cursor(self, anon_client, title):
+        response = anon_client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken')
+        assert response.status_code == 404
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+PAGE_SIZES = (10, 100, 1000)
+# Запросов на страницу не должно становиться больше с ростом её размера.
+EXPECTED_QUERIES = {
+    'titles': 3,  # COUNT, произведения с категорией, жанры
+    'reviews': 3,  # произведение, COUNT, отзывы с авторами
+    'comments': 3,  # отзыв, COUNT, комментарии с авторами
+}
+MAX_SECONDS = 2.0
+
+
+@pytest.fixture
+def catalogue(category, genres, title, user):
+    size = max(PAGE_SIZES)
+    # bulk_create возвращает pk не на всех СУБД, поэтому объекты перечитываются
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(size)
+    )
+    titles = Title.objects.filter(year=2000)
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=item.pk, genre_id=genre.pk)
+        for item in titles for genre in genres
+    )
+    User.objects.bulk_create(
+        User(username=f'author{i}', email=f'author{i}@yamdb.fake')
+        for i in range(size)
+    )
+    authors = User.objects.filter(username__startswith='author')
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв', score=5)
+        for author in authors
+    )
+    review = Review.objects.filter(title=title).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий')
+        for author in authors
+    )
+    return {
+        'titles': '/api/v1/titles/',
+        'reviews': f'/api/v1/titles/{title.pk}/reviews/',
+        'comments': (
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'),
+    }
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    @pytest.mark.parametrize('page_size', PAGE_SIZES)
+    @pytest.mark.parametrize('endpoint', EXPECTED_QUERIES)
+    def test_list_query_count(self, anon_client, catalogue, monkeypatch,
+                              endpoint, page_size):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = anon_client.get(catalogue[endpoint])
+            elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert len(response.json()['results']) == page_size
+        assert len(queries) == EXPECTED_QUERIES[endpoint], (
+            f'Проверьте, что список {endpoint} выполняет '
+            f'{EXPECTED_QUERIES[endpoint]} запроса при любом размере '
+            f'страницы, получено {len(queries)}:\n'
+            + '\n'.join(query['sql'] for query in queries)
+        )
+        assert elapsed < MAX_SECONDS, (
+            f'Список {endpoint} на {page_size} элементов '
+            f'отдаётся {elapsed:.2f} с'
+        )
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, review, admin):
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (10, 1, 10), (
+            'Проверьте, что создание отзыва обновляет рейтинг произведения'
+        )
+
+        Review.objects.create(title=title, author=admin, text='Так себе', score=5)
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (15, 2, 7.5)
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 1
+        review.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (6, 2, 3), (
+            'Проверьте, что изменение оценки обновляет рейтинг произведения'
+        )
+
+        Review.objects.all().delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (0, 0, None), (
+            'Проверьте, что удаление отзывов обнуляет рейтинг произведения'
+        )
+
+    def test_rating_in_api(self, anon_client, title, review):
+        response = anon_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 10
+
+    def test_rebuild_ratings(self, title, review):
+        Title.objects.update(score_sum=0, score_count=0, rating=None)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (10, 1, 10), (
+            'Проверьте, что команда rebuild_ratings пересчитывает рейтинг'
+        )
@@ -0,0 +1,166 @@
+import pytest
+from django.apps import apps
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_cache
+from api.db_router import ReplicaRouter
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def read_aliases(monkeypatch, settings):
+    """Запоминает, какую базу выбрал роутер, но читает с default:
+    в тестах реплика — та же тестовая база."""
+    settings.REPLICA_DATABASES = ['replica1']
+    settings.REPLICA_LAG_SECONDS = 0
+    chosen = []
+    original = ReplicaRouter.db_for_read
+
+    def db_for_read(self, model, **hints):
+        chosen.append(original(self, model, **hints))
+        return 'default'
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', db_for_read)
+    return chosen
+
+
+@pytest.mark.django_db
+class TestReplicaRouting:
+
+    def test_safe_requests_read_from_replica(self, read_aliases,
+                                             user_client, title):
+        response = user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert 'replica1' in read_aliases, (
+            'Проверьте, что GET-запросы к отзывам читают с реплики'
+        )
+
+    def test_authentication_reads_from_primary(self, read_aliases,
+                                               user_client, title):
+        user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert read_aliases[0] == 'default', (
+            'Проверьте, что пользователь загружается с основной базы'
+        )
+
+    def test_read_your_writes(self, read_aliases, settings, user_client,
+                              title):
+        settings.REPLICA_LAG_SECONDS = 60
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == 201
+        settings.REPLICA_LAG_SECONDS = 0
+        read_aliases.clear()
+        user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert read_aliases and 'replica1' not in read_aliases, (
+            'Проверьте, что после записи пользователь читает '
+            'с основной базы'
+        )
+
+    def test_other_users_not_pinned(self, read_aliases, settings,
+                                    user_client, moderator_client, title):
+        settings.REPLICA_LAG_SECONDS = 60
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': 5}
+        )
+        settings.REPLICA_LAG_SECONDS = 0
+        read_aliases.clear()
+        moderator_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert 'replica1' in read_aliases
+
+    def test_recently_changed_data_read_from_primary(
+            self, read_aliases, settings, anon_client, title):
+        settings.REPLICA_LAG_SECONDS = 60
+        anon_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert 'replica1' not in read_aliases, (
+            'Проверьте, что недавно изменённые данные читаются '
+            'с основной базы, а не с отстающей реплики'
+        )
+
+
+@pytest.fixture
+def replicas(db, settings, tmp_path, title):
+    """Две реплики — отдельные файлы SQLite со своей копией произведения
+    title: название и жанр показывают, с какой базы прочитан ответ."""
+    settings.REPLICA_LAG_SECONDS = 0
+    aliases = ['replica1', 'replica2']
+    for alias in aliases:
+        connections.settings[alias] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(tmp_path / f'{alias}.sqlite3'),
+        }
+        with connections[alias].schema_editor() as editor:
+            for model in apps.get_models():
+                editor.create_model(model)
+        Category.objects.using(alias).bulk_create([Category(
+            pk=title.category_id, name=alias, slug=title.category.slug)])
+        Genre.objects.using(alias).bulk_create([
+            Genre(pk=1000, name=alias, slug=alias)])
+        Title.objects.using(alias).bulk_create([Title(
+            pk=title.pk, name=alias, year=title.year,
+            category_id=title.category_id)])
+        Title.genre.through.objects.using(alias).bulk_create([
+            Title.genre.through(title_id=title.pk, genre_id=1000)])
+    settings.REPLICA_DATABASES = aliases
+    yield {alias: connections[alias] for alias in aliases}
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+class TestReplicaDatabases:
+
+    def test_reads_from_one_replica_per_request(self, anon_client,
+                                                replicas):
+        seen = set()
+        for _ in range(30):
+            get_cache().clear()
+            response = anon_client.get('/api/v1/titles/')
+            assert response.status_code == 200
+            item = response.json()['results'][0]
+            assert [genre['slug'] for genre in item['genre']] == [
+                item['name']], (
+                'Проверьте, что произведения и их жанры (prefetch) читаются '
+                'с одной и той же реплики'
+            )
+            seen.add(item['name'])
+        assert seen == set(replicas), (
+            'Проверьте, что GET-запросы распределяются по репликам'
+        )
+
+    def test_writes_use_primary(self, user_client, replicas, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(replicas['replica1']) as first, \
+                CaptureQueriesContext(replicas['replica2']) as second:
+            response = user_client.post(url, {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        assert not first.captured_queries and not second.captured_queries, (
+            'Проверьте, что запись идёт только в основную базу'
+        )
+        for alias in replicas:
+            assert not Review.objects.using(alias).exists()
+
+    def test_pinned_user_reads_primary(self, settings, user_client,
+                                       moderator_client, replicas, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        settings.REPLICA_LAG_SECONDS = 60
+        user_client.post(url, {'text': 'Отзыв', 'score': 5})
+        settings.REPLICA_LAG_SECONDS = 0
+        assert [item['text'] for item in user_client.get(
+            url).json()['results']] == ['Отзыв'], (
+            'Проверьте, что после записи пользователь читает '
+            'с основной базы'
+        )
+        assert moderator_client.get(url).json()['results'] == [], (
+            'Проверьте, что остальные пользователи читают с реплики'
+        )
+
+    def test_primary_reads_outside_api(self, anon_client, replicas, title):
+        assert Title.objects.get(pk=title.pk).name == title.name
+        get_cache().clear()
+        assert anon_client.get(
+            f'/api/v1/titles/{title.id}/').json()['name'] in replicas
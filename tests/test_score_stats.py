@@ -0,0 +1,140 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Review, ScoreHistogram, Title
+from users.models import User
+
+
+@pytest.fixture
+def scored_title(title):
+    """Произведение с оценками 2, 7, 7 и 9; отзыв с оценкой 2 старый."""
+    for i, score in enumerate((2, 7, 7, 9)):
+        author = User.objects.create_user(
+            username=f'critic{i}', email=f'critic{i}@yamdb.fake')
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score)
+    Review.objects.filter(score=2).update(
+        pub_date=timezone.now() - timedelta(days=30))
+    return title
+
+
+def histogram_of(title):
+    return ScoreHistogram.objects.get(title=title).counts
+
+
+@pytest.mark.django_db
+class TestScoreHistogram:
+
+    def test_follows_reviews(self, scored_title):
+        assert histogram_of(scored_title) == {
+            **{score: 0 for score in range(1, 11)}, 2: 1, 7: 2, 9: 1}
+
+        review = Review.objects.get(title=scored_title, score=9)
+        review.score = 3
+        review.save()
+        counts = histogram_of(scored_title)
+        assert (counts[9], counts[3]) == (0, 1), (
+            'Проверьте, что изменение оценки переносит её в гистограмме'
+        )
+
+        Review.objects.filter(score=7).delete()
+        assert histogram_of(scored_title)[7] == 0
+        assert not ScoreHistogram.objects.drifted().exists()
+
+    def test_created_for_bulk_titles(self, user):
+        title = Title.objects.bulk_create([Title(id=500, name='Без', year=1)])
+        Review.objects.create(
+            title=title[0], author=user, text='Отзыв', score=4)
+        assert histogram_of(title[0])[4] == 1
+
+    def test_title_delete_cascades(self, scored_title):
+        scored_title.delete()
+        assert not ScoreHistogram.objects.exists()
+
+    def test_median_and_mean(self):
+        histogram = ScoreHistogram(score_2=1, score_7=2, score_9=1)
+        assert (histogram.total, histogram.mean, histogram.median) == (
+            4, 6.25, 7)
+        histogram = ScoreHistogram(score_1=1, score_10=1)
+        assert histogram.median == 5.5
+        assert ScoreHistogram().median is None
+
+    def test_rebuild_and_check(self, scored_title):
+        ScoreHistogram.objects.update(score_7=0, score_1=5)
+        assert ScoreHistogram.objects.drifted().exists()
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check', verbosity=0)
+
+        call_command('rebuild_ratings', verbosity=0)
+        call_command('rebuild_ratings', '--check', verbosity=0)
+        assert histogram_of(scored_title)[7] == 2
+
+
+@pytest.mark.django_db
+class TestScoreStatsAPI:
+
+    def test_stats(self, anon_client, scored_title):
+        with CaptureQueriesContext(connection) as queries:
+            response = anon_client.get(
+                f'/api/v1/titles/{scored_title.id}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['title'] == scored_title.id
+        assert data['count'] == 4
+        assert data['scores']['7'] == 2
+        assert data['scores']['10'] == 0
+        assert (data['mean'], data['median']) == (6.25, 7)
+        assert data['velocity']['reviews'] == 3
+        assert not any('"reviews_review"."score"' in query['sql']
+                       and 'COUNT' not in query['sql']
+                       for query in queries.captured_queries), (
+            'Проверьте, что статистика не читает оценки всех отзывов'
+        )
+
+    def test_stats_without_reviews(self, anon_client, title):
+        ScoreHistogram.objects.all().delete()
+        response = anon_client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0
+        assert response.json()['mean'] is None
+
+    def test_stats_not_found(self, anon_client):
+        response = anon_client.get('/api/v1/titles/999/stats/')
+        assert response.status_code == 404
+
+    def test_stats_etag(self, anon_client, scored_title, admin,
+                        django_capture_on_commit_callbacks):
+        url = f'/api/v1/titles/{scored_title.id}/stats/'
+        etag = anon_client.get(url)['ETag']
+        assert anon_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=scored_title, author=admin, text='Ещё', score=10)
+        response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['count'] == 5
+
+    def test_stats_velocity_expires(self, anon_client, scored_title,
+                                    monkeypatch, settings):
+        settings.API_VERSION_TIMEOUT = None
+        url = f'/api/v1/titles/{scored_title.id}/stats/'
+        etag = anon_client.get(url)['ETag']
+        Review.objects.update(pub_date=timezone.now() - timedelta(days=30))
+        assert anon_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        later = time.time() + settings.STATS_VELOCITY_PERIOD
+        monkeypatch.setattr(time, 'time', lambda: later)
+        response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag статистики устаревает вместе с velocity'
+        )
+        assert response.json()['velocity']['reviews'] == 0
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+from django.db import connection
+
+from reviews.models import Title
+
+# Сравнение с поиском подстроки запускается только с размером каталога:
+# BENCH_TITLES=1000000 pytest tests/test_search.py -s
+BENCH_TITLES = int(os.getenv('BENCH_TITLES', 0))
+WORDS = ('побег', 'крестный', 'отец', 'зеленая', 'миля', 'форрест', 'гамп',
+         'список', 'шиндлера', 'король', 'лев', 'начало', 'интерстеллар')
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_by_name_and_description(self, anon_client, category):
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994, category=category,
+            description='Тюремная драма')
+        Title.objects.create(
+            name='Зеленая миля', year=1999, category=category,
+            description='Тюремный надзиратель, драма')
+        Title.objects.create(name='Король Лев', year=1994, category=category)
+
+        response = anon_client.get('/api/v1/titles/?search=драма')
+        names = [title['name'] for title in response.json()['results']]
+        assert sorted(names) == ['Зеленая миля', 'Побег из Шоушенка'], (
+            'Проверьте, что ?search= ищет по названию и описанию'
+        )
+
+        response = anon_client.get('/api/v1/titles/?search=Шоушенка')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Побег из Шоушенка']
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql',
+                        reason='Ранжирование есть только на PostgreSQL')
+    def test_relevance_ordering(self, anon_client, category):
+        Title.objects.create(name='Альфа', year=2000, category=category,
+                             description='Здесь есть слово драма')
+        Title.objects.create(name='Драма', year=2000, category=category)
+
+        response = anon_client.get('/api/v1/titles/?search=драма')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Драма', 'Альфа'], (
+            'Проверьте, что совпадение в названии ранжируется выше описания'
+        )
+
+    @pytest.mark.skipif(not BENCH_TITLES, reason='Задайте BENCH_TITLES')
+    def test_search_benchmark(self, category):
+        Title.objects.bulk_create(
+            (Title(
+                name=f'{WORDS[i % len(WORDS)]} {WORDS[i * 7 % len(WORDS)]}',
+                year=2000,
+                description=' '.join(WORDS[(i + j) % len(WORDS)]
+                                     for j in range(5)),
+                category=category,
+            ) for i in range(BENCH_TITLES)),
+            batch_size=10000,
+        )
+        Title.objects.create(name='Уникальное название', year=2000)
+        Title.objects.update_search_vector()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE reviews_title')
+
+        started = time.perf_counter()
+        contains = list(Title.objects.filter(
+            name__contains='Уникальное').values_list('pk', flat=True))
+        contains_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = list(Title.objects.search('Уникальное').values_list(
+            'pk', flat=True))
+        search_time = time.perf_counter() - started
+
+        print(f'\n{BENCH_TITLES} произведений ({connection.vendor}): '
+              f'contains {contains_time * 1000:.1f} мс, '
+              f'поиск {search_time * 1000:.1f} мс')
+        assert found == contains
+        if connection.vendor == 'postgresql' and BENCH_TITLES >= 100000:
+            assert search_time < contains_time, (
+                'Проверьте, что полнотекстовый поиск использует GIN-индекс'
+            )
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from api import throttling
+from api.metrics import registry
+from users.models import OutgoingEmail
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture(autouse=True)
+def rates(monkeypatch):
+    monkeypatch.setitem(
+        throttling.api_settings.DEFAULT_THROTTLE_RATES, 'signup_ip', '3/m')
+    monkeypatch.setitem(
+        throttling.api_settings.DEFAULT_THROTTLE_RATES,
+        'signup_email', '2/m')
+    registry.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [6000.0]
+    monkeypatch.setattr(throttling.time, 'time', lambda: now[0])
+    return now
+
+
+def signup(client, number, ip='10.0.0.1', email=None):
+    return client.post(
+        SIGNUP_URL,
+        data={'username': f'user{number}',
+              'email': email or f'user{number}@yamdb.fake'},
+        REMOTE_ADDR=ip,
+    )
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_ip_limit_rejects_without_db(self, anon_client, clock):
+        for number in range(3):
+            assert signup(anon_client, number).status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            response = signup(anon_client, 3)
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+        assert len(queries) == 0, (
+            'Проверьте, что запрос отклоняется до обращения к БД'
+        )
+        assert OutgoingEmail.objects.count() == 3
+        assert signup(anon_client, 4, ip='10.0.0.2').status_code == 200
+
+    def test_email_limit_across_ips(self, anon_client, clock):
+        email = 'target@yamdb.fake'
+        assert signup(anon_client, 0, '10.0.0.1', email).status_code == 200
+        assert signup(anon_client, 1, '10.0.0.2', email).status_code == 400
+        response = signup(anon_client, 2, '10.0.0.3', email.upper())
+        assert response.status_code == 429, (
+            'Проверьте, что число регистраций на один адрес ограничено '
+            'независимо от IP и регистра'
+        )
+
+    def test_sliding_window(self, anon_client, clock):
+        for number in range(3):
+            signup(anon_client, number)
+        clock[0] += 60
+        assert signup(anon_client, 3).status_code == 429, (
+            'Проверьте, что запросы прошлого окна учитываются'
+        )
+        # Половина прошлого окна вышла: оценка 3 * 0.5 + текущие.
+        clock[0] += 30
+        assert signup(anon_client, 4).status_code == 200
+        assert signup(anon_client, 5).status_code == 200
+        assert signup(anon_client, 6).status_code == 429
+
+    def test_token_throttled_by_username(self, anon_client, clock,
+                                         monkeypatch):
+        monkeypatch.setitem(
+            throttling.api_settings.DEFAULT_THROTTLE_RATES,
+            'token_username', '2/m')
+        payload = {'username': 'nobody', 'confirmation_code': 'x'}
+        for ip in ('10.0.0.1', '10.0.0.2'):
+            anon_client.post(TOKEN_URL, data=payload, REMOTE_ADDR=ip)
+        response = anon_client.post(
+            TOKEN_URL, data=payload, REMOTE_ADDR='10.0.0.3')
+        assert response.status_code == 429
+
+    def test_counters_in_metrics(self, anon_client, admin_client, clock):
+        for number in range(4):
+            signup(anon_client, number)
+        assert registry.get('yamdb_throttle_total', scope='signup',
+                            kind='ip', result='throttled') == 1
+        body = admin_client.get('/api/v1/stats/metrics/').content.decode()
+        assert ('yamdb_throttle_total{kind="ip",result="allowed",'
+                'scope="signup"} 3') in body
+
+    def test_concurrent_requests_do_not_exceed_limit(self, clock,
+                                                     monkeypatch):
+        cache = throttling.get_cache()
+
+        class SlowCache:
+            """Уступает другим потокам после каждого обращения к кешу."""
+
+            def __getattr__(self, name):
+                method = getattr(cache, name)
+
+                def call(*args, **kwargs):
+                    result = method(*args, **kwargs)
+                    time.sleep(0.01)
+                    return result
+                return call
+
+        monkeypatch.setattr(throttling, 'get_cache', SlowCache)
+        view = type('View', (), {'throttle_scope': 'signup'})()
+        barrier = threading.Barrier(10)
+        results = []
+
+        def request():
+            throttle = throttling.IPThrottle()
+            barrier.wait()
+            results.append(throttle.allow_request(
+                RequestFactory().post(SIGNUP_URL), view))
+
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 3, (
+            'Проверьте, что одновременные запросы не проходят сверх предела'
+        )
+        assert not throttling.IPThrottle().allow_request(
+            RequestFactory().post(SIGNUP_URL), view)
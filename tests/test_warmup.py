@@ -0,0 +1,26 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import warmup
+
+
+@pytest.mark.django_db
+class TestWarmUp:
+
+    def test_all_steps_run_without_queries(self, caplog):
+        with CaptureQueriesContext(connection) as queries:
+            timings = warmup.warm_up()
+        assert list(timings) == [name for name, _ in warmup.STEPS]
+        assert not queries.captured_queries, (
+            'Проверьте, что прогрев не обращается к базе данных'
+        )
+        assert 'Прогрев' not in caplog.text
+
+    def test_failed_step_is_logged(self, caplog, monkeypatch):
+        def broken():
+            raise RuntimeError('сломано')
+
+        monkeypatch.setattr(warmup, 'STEPS', (('broken', broken),))
+        assert list(warmup.warm_up()) == ['broken']
+        assert 'Прогрев broken не удался' in caplog.text